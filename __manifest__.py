@@ -1,6 +1,6 @@
 {
     'name': 'Recruitment Talent Pool',
-    'version': '1.0',
+    'version': '1.5',
     'summary': 'Beheer talenten en sollicitaties via een centrale pool',
     'description': 'Voegt een Talent Pool toe aan Odoo Recruitment.',
     'author': 'Pascal & Copilot',
@@ -9,9 +9,14 @@
     'data': [
         'security/talentpool_security.xml',
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/res_users_views.xml',
         'views/dashboard_views.xml',
+        'views/skill_catalog_views.xml',
         'views/talent_views.xml',
+        'views/talent_import_views.xml',
+        'views/talent_export_views.xml',
+        'views/talent_duplicate_views.xml',
         'views/portal_talent_views.xml',
         'views/portal_applications.xml',
         'views/portal_education.xml',
@@ -20,9 +25,13 @@
         'views/portal_education_add.xml',
         'views/portal_experience_add.xml',
         'views/portal_skills_add.xml',
+        'views/portal_education_edit.xml',
+        'views/portal_experience_edit.xml',
+        'views/portal_skills_edit.xml',
         'views/portal_apply_form.xml',            
         'views/portal_menu.xml',            
         'views/hr_applicant_views.xml',
+        'views/hr_job_views.xml',
         'views/menu.xml',
     ],
     'installable': True,
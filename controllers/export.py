@@ -0,0 +1,49 @@
+from werkzeug.exceptions import BadRequest, NotFound
+
+from odoo import http, api, fields
+from odoo.http import request, content_disposition
+from odoo.addons.wiz_recruitment_talentpool.models.talent_export import (
+    EXPORT_MIMETYPES, export_csv_chunks, export_jsonl_chunks,
+)
+from odoo.addons.wiz_recruitment_talentpool.models.talent_change import parse_cursor
+
+EXPORT_STREAMS = {
+    'csv': export_csv_chunks,
+    'jsonl': export_jsonl_chunks,
+}
+
+
+class TalentExportController(http.Controller):
+
+    # Streaming export van de volledige pool; Excel loopt via de achtergrondexport
+    @http.route('/talentpool/export/<string:file_format>', type='http', auth='user')
+    def talent_export(self, file_format, **kw):
+        if file_format not in EXPORT_STREAMS:
+            raise NotFound()
+        request.env['wiz.recruitment.talentpool.talent'].check_access_rights('read')
+        registry, uid, context = request.env.registry, request.env.uid, dict(request.env.context)
+        chunks = EXPORT_STREAMS[file_format]
+
+        def generate():
+            # Eigen cursor: de requestcursor is al gesloten terwijl de response gestreamd wordt
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                for chunk in chunks(env['wiz.recruitment.talentpool.talent']._export_iter_rows()):
+                    yield chunk.encode()
+
+        filename = f"talentpool-{fields.Date.to_string(fields.Date.context_today(request.env.user))}.{file_format}"
+        return request.make_response(generate(), headers=[
+            ('Content-Type', f'{EXPORT_MIMETYPES[file_format]}; charset=utf-8'),
+            ('Content-Disposition', content_disposition(filename)),
+        ])
+
+    # Wijzigingsfeed voor externe synchronisatie (ook via RPC: get_changes op het wijzigingsmodel)
+    @http.route('/talentpool/changes', type='http', auth='user', methods=['GET'])
+    def talent_changes(self, cursor=0, limit=None, **kw):
+        try:
+            parse_cursor(cursor)
+            limit = limit and int(limit)
+        except ValueError:
+            raise BadRequest("cursor moet een cursor uit de feed zijn en limit een geheel getal")
+        return request.make_json_response(
+            request.env['wiz.recruitment.talentpool.change'].get_changes(cursor, limit))
@@ -1,55 +1,150 @@
+import hashlib
 import logging
+import time
+from werkzeug.urls import url_encode
+
 from odoo import http, fields
 from odoo.http import request
+from odoo.osv import expression
+from odoo.tools.lru import LRU
+from odoo.addons.portal.controllers.portal import pager as portal_pager
+from odoo.addons.wiz_recruitment_talentpool.models.instrumentation import instrumented
+from odoo.addons.wiz_recruitment_talentpool.models.talent import PORTAL_PROFILE_FIELDS
 
 _logger = logging.getLogger(__name__)
 
+APPLICATIONS_PER_PAGE = 20
+
+# Gerenderde portaalpagina's per worker, op ETag; een nieuwe versie maakt een entry
+# onbereikbaar, de LRU en de levensduur ruimen ze op
+PORTAL_RENDER_CACHE_SIZE = 2000
+PORTAL_RENDER_CACHE_TTL = 600
+_render_cache = LRU(PORTAL_RENDER_CACHE_SIZE)
+
+# Secties van de bulkeditor: (One2many-veld op het talent, overzichtspagina)
+PROFILE_SECTIONS = {
+    'education': ('education_ids', '/my/education'),
+    'experience': ('experience_ids', '/my/experience'),
+    'skill': ('skill_ids', '/my/skills'),
+}
+
 
 class TalentPortal(http.Controller):
 
-    # Overzicht van sollicitaties
-    @http.route('/my/applications', type='http', auth='user', website=True)
-    def portal_applications(self):
+    def _get_talent(self):
+        # Talentprofiel van de ingelogde gebruiker
+        return request.env['wiz.recruitment.talentpool.talent']._get_portal_talent()
+
+    def _render_cached(self, template, version, get_values):
+        """ Render ``template`` via de fragmentcache, met ETag en 304 Not Modified.
+
+        De sleutel bevat de versie van de getoonde gegevens, de gebruiker, taal,
+        website en de sessie; ``get_values`` wordt enkel aangeroepen als de
+        pagina echt gerenderd moet worden. Het CSRF-token zelf verandert elke
+        seconde, maar een gecachet token blijft geldig zolang de sessie bestaat.
+        """
         user = request.env.user
+        if user._is_internal():
+            # Interne gebruikers krijgen de website-editor te zien: niet cachen
+            return request.render(template, get_values())
+        website = getattr(request, 'website', None)
+        key = repr((
+            request.env.cr.dbname, template, version, user.id, request.env.lang,
+            website and website.id, hashlib.sha1(request.session.sid.encode()).hexdigest(),
+        ))
+        etag = hashlib.sha1(key.encode()).hexdigest()
+        headers = [('ETag', f'"{etag}"'), ('Cache-Control', 'private, no-cache')]
+        if request.httprequest.if_none_match.contains(etag):
+            return request.make_response('', headers=headers, status=304)
+        cached = _render_cache.get(etag)
+        if cached and cached[0] > time.monotonic():
+            body = cached[1]
+        else:
+            body = request.render(template, get_values()).render()
+            _render_cache[etag] = (time.monotonic() + PORTAL_RENDER_CACHE_TTL, body)
+        return request.make_response(body, headers=headers + [('Content-Type', 'text/html; charset=utf-8')])
 
+    # Overzicht van sollicitaties
+    @http.route(['/my/applications', '/my/applications/page/<int:page>'], type='http', auth='user', website=True)
+    @instrumented
+    def portal_applications(self, page=1, sortby=None, stage=None, job=None, **kw):
         # Zoek het talentprofiel van de ingelogde gebruiker
-        talent = request.env['wiz.recruitment.talentpool.talent'].sudo().search([
-            ('portal_user_id', '=', user.id)
-        ], limit=1)
+        talent = self._get_talent()
+        Applicant = request.env['hr.applicant'].sudo()
 
-        # Zoek sollicitaties die gekoppeld zijn aan dat talentprofiel
-        applications = request.env['hr.applicant'].sudo().search([
-            ('talent_id', '=', talent.id),
-            ('active', '=', True)
-        ]) if talent else []
+        searchbar_sortings = {
+            'date': {'label': "Datum", 'order': 'create_date desc, id desc'},
+            'name': {'label': "Sollicitatie", 'order': 'name, id'},
+            'job': {'label': "Functie", 'order': 'job_id, id'},
+            'stage': {'label': "Status", 'order': 'stage_id, id'},
+            'recruiter': {'label': "Recruiter", 'order': 'user_id, id'},
+        }
+        if sortby not in searchbar_sortings:
+            sortby = 'date'
+
+        # Sollicitaties die gekoppeld zijn aan dat talentprofiel, gefilterd in het domein
+        base_domain = [('talent_id', '=', talent.id), ('active', '=', True)] if talent else expression.FALSE_DOMAIN
+        stages = [stage_rec for stage_rec, in Applicant._read_group(base_domain, ['stage_id']) if stage_rec]
+        jobs = [job_rec for job_rec, in Applicant._read_group(base_domain, ['job_id']) if job_rec]
+        stage_id = int(stage) if stage and stage.isdigit() else None
+        job_id = int(job) if job and job.isdigit() else None
+        domain = list(base_domain)
+        if stage_id:
+            domain.append(('stage_id', '=', stage_id))
+        if job_id:
+            domain.append(('job_id', '=', job_id))
+
+        filter_args = {'stage': stage_id or '', 'job': job_id or ''}
+        pager = portal_pager(
+            url='/my/applications',
+            url_args=dict(filter_args, sortby=sortby),
+            total=Applicant.search_count(domain),
+            page=page,
+            step=APPLICATIONS_PER_PAGE,
+        )
+        applications = Applicant.search(
+            domain, order=searchbar_sortings[sortby]['order'], limit=APPLICATIONS_PER_PAGE, offset=pager['offset'],
+        )
+        # Gerelateerde namen in één query per model voorladen
+        applications.job_id.mapped('name')
+        applications.stage_id.mapped('name')
+        applications.user_id.mapped('name')
 
-        _logger.info("Aantal sollicitaties gevonden: %s", len(applications))
-        
         return request.render('wiz_recruitment_talentpool.portal_applications', {
             'applications': applications,
+            'pager': pager,
+            'sort_urls': {
+                key: '/my/applications?%s' % url_encode(dict(filter_args, sortby=key))
+                for key in searchbar_sortings
+            },
+            'sortby': sortby,
+            'stages': stages,
+            'jobs': jobs,
+            'stage_id': stage_id,
+            'job_id': job_id,
         })
 
     # GET: Toon formulier voor sollicitatie via portaal
     @http.route('/my/apply', type='http', auth='user', website=True)
+    @instrumented
     def portal_apply_form(self):
-        jobs = request.env['hr.job'].sudo().search([('website_published', '=', True)])
-        _logger.info("Sollicitatieformulier geladen met %s functies", len(jobs))
-        return request.render('wiz_recruitment_talentpool.portal_apply_form', {
-            'jobs': jobs,
-        })
+        Job = request.env['hr.job'].sudo()
+
+        def get_values():
+            # website_published bestaat enkel als website_hr_recruitment geïnstalleerd is
+            jobs = Job.search([('website_published', '=', True)] if 'website_published' in Job._fields else [])
+            return {'jobs': jobs}
+
+        return self._render_cached('wiz_recruitment_talentpool.portal_apply_form',
+                                   Job._get_portal_job_version(), get_values)
 
     # POST: Verwerk het sollicitatieformulier in de portaal
     @http.route('/my/apply/submit', type='http', auth='user', methods=['POST'], website=True, csrf=True)
+    @instrumented
     def portal_apply_submit(self, **post):
-        _logger.info("POST ontvangen: %s", post)
         user = request.env.user
         job_id = int(post.get('job_id', 0))
-        _logger.info("Gekozen job_id: %s", job_id)
-
-        talent = request.env['wiz.recruitment.talentpool.talent'].sudo().search([
-            ('portal_user_id', '=', user.id)
-        ], limit=1)
-        _logger.info("Gevonden talentprofiel: %s", talent.name if talent else "Geen")
+        talent = self._get_talent()
 
         if not talent or not job_id:
             _logger.warning("Geen talentprofiel of job geselecteerd — redirect naar formulier")
@@ -62,13 +157,12 @@ class TalentPortal(http.Controller):
             'talent_id': talent.id,
             'job_id': job_id,
         })
-        _logger.info("Applicant aangemaakt: %s (ID %s)", applicant.name, applicant.id)
+        _logger.info("Sollicitatie %s aangemaakt via het portaal", applicant.id)
 
         # Kopieer talentdata
         if hasattr(applicant, 'copy_talent_data_to_applicant'):
             try:
                 applicant.copy_talent_data_to_applicant(talent)
-                _logger.info("Talentdata succesvol gekopieerd naar applicant")
             except Exception as e:
                 _logger.error("Fout bij kopiëren van talentdata: %s", str(e))
 
@@ -77,11 +171,9 @@ class TalentPortal(http.Controller):
     
     # Toon de Talent-persoonsgegevens en wensen in de portaal
     @http.route('/my/talent', type='http', auth='user', website=True)
+    @instrumented
     def portal_talent_profile(self):
-        user = request.env.user
-        talent = request.env['wiz.recruitment.talentpool.talent'].sudo().search([
-            ('portal_user_id', '=', user.id)
-        ], limit=1)
+        talent = self._get_talent()
 
         if not talent:
             return request.render('wiz_recruitment_talentpool.portal_talent_profile', {
@@ -89,25 +181,27 @@ class TalentPortal(http.Controller):
                 'applications': [],
             })
 
-        applications = request.env['hr.applicant'].sudo().search([
-            ('talent_id', '=', talent.id),
-            ('active', '=', True)
-        ])
+        def get_values():
+            applications = request.env['hr.applicant'].sudo().search([
+                ('talent_id', '=', talent.id),
+                ('active', '=', True)
+            ])
+            return {
+                'talent': talent,
+                'applications': applications,
+                'educations': talent.education_ids,
+                'experiences': talent.experience_ids,
+                'skills': talent.skill_ids,
+            }
 
-        return request.render('wiz_recruitment_talentpool.portal_talent_profile', {
-            'talent': talent,
-            'applications': applications,
-            'educations': talent.education_ids,
-            'experiences': talent.experience_ids,
-            'skills': talent.skill_ids,
-        })
+        # Vacature- en fasenamen van de sollicitaties staan ook op de pagina
+        version = (talent.portal_version, request.env['hr.job'].sudo()._get_portal_job_version())
+        return self._render_cached('wiz_recruitment_talentpool.portal_talent_profile', version, get_values)
 
     @http.route('/my/talent/update', type='http', auth='user', methods=['POST'], website=True)
+    @instrumented
     def portal_talent_update(self, **post):
-        user = request.env.user
-        talent = request.env['wiz.recruitment.talentpool.talent'].sudo().search([
-            ('portal_user_id', '=', user.id)
-        ], limit=1)
+        talent = self._get_talent()
         if talent:
             talent.write({
                 'searching_for': post.get('searching_for'),
@@ -122,27 +216,32 @@ class TalentPortal(http.Controller):
     # -------------------------------------
     # Toon de educatie en scholing in de portaal
     @http.route('/my/education', type='http', auth='user', website=True)
+    @instrumented
     def portal_education(self):
-        user = request.env.user
-        talent = request.env['wiz.recruitment.talentpool.talent'].sudo().search([
-            ('portal_user_id', '=', user.id)
-        ], limit=1)
-        educations = talent.education_ids if talent else []
-        return request.render('wiz_recruitment_talentpool.portal_education', {
+        talent = self._get_talent()
+        return self._render_cached('wiz_recruitment_talentpool.portal_education', talent.portal_version, lambda: {
             'talent': talent,
+            'educations': talent.education_ids if talent else [],
+        })
+
+    @http.route('/my/education/edit', type='http', auth='user', website=True)
+    @instrumented
+    def portal_education_edit(self):
+        talent = self._get_talent()
+        educations = talent.education_ids if talent else []
+        return request.render('wiz_recruitment_talentpool.portal_education_edit', {
             'educations': educations,
         })
 
     @http.route('/my/education/add', type='http', auth='user', website=True)
+    @instrumented
     def portal_education_add(self):
         return request.render('wiz_recruitment_talentpool.portal_education_add', {})
 
     @http.route('/my/education/add/submit', type='http', auth='user', methods=['POST'], website=True, csrf=True)
+    @instrumented
     def portal_education_submit(self, **post):
-        user = request.env.user
-        talent = request.env['wiz.recruitment.talentpool.talent'].sudo().search([
-            ('portal_user_id', '=', user.id)
-        ], limit=1)
+        talent = self._get_talent()
         if talent:
             request.env['recruitment.education'].sudo().create({
                 'name': post.get('name'),
@@ -158,27 +257,23 @@ class TalentPortal(http.Controller):
     # -------------------------------------
     # Toon de werkervaring en vorige werkgevers in de portaal
     @http.route('/my/experience', type='http', auth='user', website=True)
+    @instrumented
     def portal_experience(self):
-        user = request.env.user
-        talent = request.env['wiz.recruitment.talentpool.talent'].sudo().search([
-            ('portal_user_id', '=', user.id)
-        ], limit=1)
-        experiences = talent.experience_ids if talent else []
-        return request.render('wiz_recruitment_talentpool.portal_experience', {
+        talent = self._get_talent()
+        return self._render_cached('wiz_recruitment_talentpool.portal_experience', talent.portal_version, lambda: {
             'talent': talent,
-            'experiences': experiences,
+            'experiences': talent.experience_ids if talent else [],
         })
 
     @http.route('/my/experience/add', type='http', auth='user', website=True)
+    @instrumented
     def portal_experience_add(self):
         return request.render('wiz_recruitment_talentpool.portal_experience_add', {})
 
     @http.route('/my/experience/add/submit', type='http', auth='user', methods=['POST'], website=True, csrf=True)
+    @instrumented
     def portal_experience_submit(self, **post):
-        user = request.env.user
-        talent = request.env['wiz.recruitment.talentpool.talent'].sudo().search([
-            ('portal_user_id', '=', user.id)
-        ], limit=1)
+        talent = self._get_talent()
         if talent:
             request.env['recruitment.experience'].sudo().create({
                 'name': post.get('name'),
@@ -191,28 +286,30 @@ class TalentPortal(http.Controller):
         return request.redirect('/my/experience')
     
     @http.route('/my/experience/edit', type='http', auth='user', website=True)
+    @instrumented
     def portal_experience_edit(self):
-        user = request.env.user
-        talent = request.env['wiz.recruitment.talentpool.talent'].sudo().search([
-            ('portal_user_id', '=', user.id)
-        ], limit=1)
+        talent = self._get_talent()
         experiences = talent.experience_ids if talent else []
         return request.render('wiz_recruitment_talentpool.portal_experience_edit', {
             'experiences': experiences,
         })
 
     @http.route('/my/experience/update', type='http', auth='user', methods=['POST'], website=True, csrf=True)
+    @instrumented
     def portal_experience_update(self, **post):
-        ids = request.httprequest.form.getlist('exp_ids')
-        for exp_id in ids:
-            exp = request.env['recruitment.experience'].sudo().browse(int(exp_id))
-            exp.write({
-                'name': post.get(f'name_{exp_id}'),
-                'company': post.get(f'company_{exp_id}'),
-                'start_date': post.get(f'start_{exp_id}'),
-                'end_date': post.get(f'end_{exp_id}'),
-                'description': post.get(f'desc_{exp_id}'),
-            })
+        # Oud formaat (exp_ids, start_/end_/desc_) omzetten naar de bulkeditor
+        form = request.httprequest.form
+        talent = self._get_talent()
+        if talent:
+            talent._portal_apply_profile_changes({'experience_ids': {'update': {
+                exp_id: {
+                    'name': form.get(f'name_{exp_id}'),
+                    'company': form.get(f'company_{exp_id}'),
+                    'start_date': form.get(f'start_{exp_id}'),
+                    'end_date': form.get(f'end_{exp_id}'),
+                    'description': form.get(f'desc_{exp_id}'),
+                } for exp_id in form.getlist('exp_ids') if exp_id.isdigit()
+            }}})
         return request.redirect('/my/experience')
 
     # -------------------------------------
@@ -220,26 +317,39 @@ class TalentPortal(http.Controller):
     # -------------------------------------
     # Toon de Skill en ervaring in de portaal
     @http.route('/my/skills', type='http', auth='user', website=True)
+    @instrumented
     def portal_skills(self):
-        user = request.env.user
-        talent = request.env['wiz.recruitment.talentpool.talent'].sudo().search([
-            ('portal_user_id', '=', user.id)
-        ], limit=1)
-        skills = talent.skill_ids if talent else []
-        return request.render('wiz_recruitment_talentpool.portal_skills', {
+        talent = self._get_talent()
+        return self._render_cached('wiz_recruitment_talentpool.portal_skills', talent.portal_version, lambda: {
             'talent': talent,
+            'skills': talent.skill_ids if talent else [],
         })
     
+    @http.route('/my/skills/edit', type='http', auth='user', website=True)
+    @instrumented
+    def portal_skills_edit(self):
+        talent = self._get_talent()
+        skills = talent.skill_ids if talent else []
+        return request.render('wiz_recruitment_talentpool.portal_skills_edit', {
+            'skills': skills,
+        })
+
     @http.route('/my/skills/add', type='http', auth='user', website=True)
+    @instrumented
     def portal_skills_add(self):
         return request.render('wiz_recruitment_talentpool.portal_skills_add', {})
 
+    # Suggesties uit de skillcatalogus (prefixindex in het geheugen, geen query per toets)
+    @http.route('/my/skills/autocomplete', type='http', auth='user', methods=['GET'])
+    @instrumented
+    def portal_skills_autocomplete(self, term='', **kw):
+        return request.make_json_response(
+            request.env['wiz.recruitment.talentpool.skill.catalog']._autocomplete(term))
+
     @http.route('/my/skills/add/submit', type='http', auth='user', methods=['POST'], website=True, csrf=True)
+    @instrumented
     def portal_skills_submit(self, **post):
-        user = request.env.user
-        talent = request.env['wiz.recruitment.talentpool.talent'].sudo().search([
-            ('portal_user_id', '=', user.id)
-        ], limit=1)
+        talent = self._get_talent()
         if talent:
             request.env['recruitment.skill'].sudo().create({
                 'name': post.get('name'),
@@ -247,3 +357,54 @@ class TalentPortal(http.Controller):
                 'talent_id': talent.id,
             })
         return request.redirect('/my/skills')
+
+    # -------------------------------------
+    # ---  BULKEDITOR - PORTAALLOGICA   ---
+    # -------------------------------------
+    # Opleidingen, ervaringen en skills in één keer bewaren (toevoegen, wijzigen, verwijderen)
+    @http.route('/my/profile/bulk_edit', type='http', auth='user', methods=['POST'], website=True, csrf=True)
+    @instrumented
+    def portal_profile_bulk_edit(self, section=None, **post):
+        if section not in PROFILE_SECTIONS:
+            return request.redirect('/my/talent')
+        fname, redirect_url = PROFILE_SECTIONS[section]
+        talent = self._get_talent()
+        if talent:
+            talent._portal_apply_profile_changes({
+                fname: self._parse_profile_form(fname, request.httprequest.form),
+            })
+        return request.redirect(redirect_url)
+
+    @http.route('/my/profile/bulk_edit/json', type='json', auth='user', methods=['POST'], website=True)
+    @instrumented
+    def portal_profile_bulk_edit_json(self, changes=None, **kw):
+        # changes: {'education': {'create': [...], 'update': {id: {...}}, 'delete': [ids]}, ...}
+        talent = self._get_talent()
+        if not talent:
+            return {'error': "Geen talentprofiel gekoppeld."}
+        counts = talent._portal_apply_profile_changes({
+            PROFILE_SECTIONS[section][0]: change
+            for section, change in (changes or {}).items()
+            if section in PROFILE_SECTIONS
+        })
+        return {'counts': counts}
+
+    def _parse_profile_form(self, fname, form):
+        """ Zet een gepost bewerkformulier om naar het changes-formaat van de bulkeditor.
+
+        Bestaande regels: ``record_ids`` met velden ``<veld>_<id>``; te verwijderen
+        regels: ``delete_ids``; nieuwe regels: lijsten ``new_<veld>``.
+        """
+        allowed = PORTAL_PROFILE_FIELDS[fname]
+        new_columns = [form.getlist(f'new_{field}') for field in allowed]
+        return {
+            'update': {
+                record_id: {
+                    field: form.get(f'{field}_{record_id}')
+                    for field in allowed if f'{field}_{record_id}' in form
+                }
+                for record_id in form.getlist('record_ids') if record_id.isdigit()
+            },
+            'delete': [record_id for record_id in form.getlist('delete_ids') if record_id.isdigit()],
+            'create': [dict(zip(allowed, row)) for row in zip(*new_columns)],
+        }
@@ -0,0 +1,52 @@
+import logging
+
+from psycopg2.extras import execute_values
+
+from odoo.addons.wiz_recruitment_talentpool.models.talent import normalize_email, normalize_linkedin
+
+_logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+
+
+def migrate(cr, version):
+    # Dedup-sleutels in blokken invullen. Bij bestaande dubbels krijgt enkel
+    # het oudste talent de sleutel, zodat de unieke constraint blijft gelden.
+    seen_emails = set()
+    seen_linkedin = set()
+    duplicates = 0
+    last_id = 0
+    while True:
+        cr.execute("""
+            SELECT id, email, linkedin_profile
+              FROM wiz_recruitment_talentpool_talent
+             WHERE id > %s
+          ORDER BY id
+             LIMIT %s
+        """, (last_id, BATCH_SIZE))
+        rows = cr.fetchall()
+        if not rows:
+            break
+        values = []
+        for talent_id, email, linkedin_profile in rows:
+            email_key = normalize_email(email) or None
+            linkedin_key = normalize_linkedin(linkedin_profile) or None
+            if email_key and email_key in seen_emails:
+                email_key = None
+                duplicates += 1
+            if linkedin_key and linkedin_key in seen_linkedin:
+                linkedin_key = None
+                duplicates += 1
+            seen_emails.add(email_key)
+            seen_linkedin.add(linkedin_key)
+            values.append((talent_id, email_key, linkedin_key))
+        execute_values(cr._obj, """
+            UPDATE wiz_recruitment_talentpool_talent t
+               SET email_key = v.email_key, linkedin_key = v.linkedin_key
+              FROM (VALUES %s) AS v(id, email_key, linkedin_key)
+             WHERE t.id = v.id
+        """, values, page_size=1000)
+        last_id = rows[-1][0]
+        _logger.info("Dedup-sleutels ingevuld tot talent %s", last_id)
+    if duplicates:
+        _logger.warning("%s dubbele dedup-sleutels niet ingevuld; voeg deze talenten samen.", duplicates)
@@ -0,0 +1,8 @@
+def migrate(cr, version):
+    # Kolommen vooraf aanmaken zodat de ORM de dedup-sleutels niet in één
+    # keer voor de volledige pool berekent; post-migrate vult ze in blokken.
+    cr.execute("""
+        ALTER TABLE wiz_recruitment_talentpool_talent
+            ADD COLUMN IF NOT EXISTS email_key varchar,
+            ADD COLUMN IF NOT EXISTS linkedin_key varchar
+    """)
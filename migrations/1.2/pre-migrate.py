@@ -0,0 +1,11 @@
+def migrate(cr, version):
+    # inactive_tag wordt opgeslagen: kolom vooraf in SQL vullen in plaats van
+    # de ORM de berekening voor de volledige pool te laten doen.
+    cr.execute("""
+        ALTER TABLE wiz_recruitment_talentpool_talent
+            ADD COLUMN IF NOT EXISTS inactive_tag boolean
+    """)
+    cr.execute("""
+        UPDATE wiz_recruitment_talentpool_talent
+           SET inactive_tag = COALESCE(last_update_date < current_date - 365, false)
+    """)
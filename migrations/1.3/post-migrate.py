@@ -0,0 +1,55 @@
+import logging
+
+from psycopg2.extras import execute_values
+
+from odoo.addons.wiz_recruitment_talentpool.models.skill_catalog import normalize_skill
+
+_logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+
+
+def migrate(cr, version):
+    # Bestaande skills in blokken aan de catalogus koppelen. Per genormaliseerde
+    # naam wordt de eerst geziene schrijfwijze de canonieke naam.
+    catalog = {}
+    last_id = 0
+    while True:
+        cr.execute("""
+            SELECT id, name
+              FROM recruitment_skill
+             WHERE id > %s AND catalog_id IS NULL
+          ORDER BY id
+             LIMIT %s
+        """, (last_id, BATCH_SIZE))
+        rows = cr.fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        keys = {skill_id: normalize_skill(name) for skill_id, name in rows}
+        missing = {}
+        for skill_id, name in rows:
+            if keys[skill_id] and keys[skill_id] not in catalog:
+                missing.setdefault(keys[skill_id], ' '.join(name.split()))
+        if missing:
+            execute_values(cr._obj, """
+                INSERT INTO wiz_recruitment_talentpool_skill_catalog (name, key, create_uid, write_uid, create_date, write_date)
+                SELECT v.name, v.key, 1, 1, now() AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC'
+                  FROM (VALUES %s) AS v(name, key)
+                    ON CONFLICT (key) DO NOTHING
+            """, [(name, key) for key, name in missing.items()], page_size=1000)
+            cr.execute("""
+                SELECT key, id FROM wiz_recruitment_talentpool_skill_catalog WHERE key = ANY(%s)
+            """, (list(missing),))
+            catalog.update(cr.fetchall())
+        values = [(skill_id, catalog[key]) for skill_id, key in keys.items() if key]
+        if values:
+            execute_values(cr._obj, """
+                UPDATE recruitment_skill s
+                   SET catalog_id = v.catalog_id
+                  FROM (VALUES %s) AS v(id, catalog_id)
+                 WHERE s.id = v.id
+            """, values, page_size=1000)
+        _logger.info("Skills aan de catalogus gekoppeld tot skill %s", last_id)
+    # Matchkenmerken opnieuw opbouwen met de canonieke skills
+    cr.execute("UPDATE wiz_recruitment_talentpool_talent SET match_features_dirty = true")
@@ -0,0 +1,35 @@
+import logging
+
+from psycopg2.extras import execute_values
+
+from odoo import api, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    # Sollicitatietellers in één read_group vullen, daarna incrementeel bijgehouden
+    env = api.Environment(cr, SUPERUSER_ID, {'active_test': False})
+    stats = {}
+    for talent, active, count, last in env['hr.applicant']._read_group(
+            [('talent_id', '!=', False)], ['talent_id', 'active'], ['__count', 'create_date:max']):
+        total, active_count, last_date = stats.get(talent.id, (0, 0, None))
+        stats[talent.id] = (
+            total + count,
+            active_count + (count if active else 0),
+            max(filter(None, [last_date, last]), default=None),
+        )
+    cr.execute("""
+        UPDATE wiz_recruitment_talentpool_talent
+           SET application_count = 0, active_application_count = 0, last_application_date = NULL
+    """)
+    if stats:
+        execute_values(cr._obj, """
+            UPDATE wiz_recruitment_talentpool_talent t
+               SET application_count = v.total,
+                   active_application_count = v.active,
+                   last_application_date = v.last
+              FROM (VALUES %s) AS v(id, total, active, last)
+             WHERE t.id = v.id
+        """, [(talent_id, *values) for talent_id, values in stats.items()], page_size=1000)
+    _logger.info("Sollicitatietellers ingevuld voor %s talenten", len(stats))
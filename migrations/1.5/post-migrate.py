@@ -0,0 +1,14 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    # LinkedIn-sleutels die niet uit een profiel-URL komen (bedrijfspagina's, vrije tekst) wissen
+    cr.execute(r"""
+        UPDATE wiz_recruitment_talentpool_talent
+           SET linkedin_key = NULL
+         WHERE linkedin_key IS NOT NULL
+           AND COALESCE(linkedin_profile, '') !~* 'linkedin\.com/(in|pub)/[^/?#]+'
+    """)
+    _logger.info("LinkedIn-sleutel gewist voor %s talenten zonder profiel-URL", cr.rowcount)
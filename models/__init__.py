@@ -1,3 +1,15 @@
+from . import instrumentation
+from . import cache_version
 from . import talent
+from . import skill_catalog
+from . import talent_search
+from . import talent_match
+from . import cv_extraction
+from . import talent_import
+from . import talent_export
+from . import talent_change
+from . import talent_duplicate
 from . import dashboard
 from . import hr_applicant_extension
+from . import hr_job
+from . import res_users
@@ -0,0 +1,37 @@
+from odoo import models, fields, api
+
+
+class CacheVersion(models.Model):
+    """ Versietellers voor gecachte gegevens, met SQL opgehoogd in de transactie van de wijziging.
+
+    Een nieuwe versie wordt dus pas zichtbaar samen met de wijziging zelf, en
+    er wordt geen ormcache leeggemaakt zoals bij ir.config_parameter. De waarden
+    komen uit een sequentie: een teruggedraaide versie wordt nooit hergebruikt.
+    """
+    _name = 'wiz.recruitment.talentpool.cache.version'
+    _description = 'Cacheversie'
+    _log_access = False
+
+    name = fields.Char(required=True)
+    version = fields.Integer(required=True, default=0)
+
+    _sql_constraints = [
+        ('name_unique', 'unique(name)', "Deze cacheversie bestaat al."),
+    ]
+
+    def init(self):
+        self.env.cr.execute(f"CREATE SEQUENCE IF NOT EXISTS {self._table}_seq")
+
+    @api.model
+    def _bump(self, name):
+        self.env.cr.execute(f"""
+            INSERT INTO {self._table} (name, version) VALUES (%s, nextval('{self._table}_seq'))
+            ON CONFLICT (name) DO UPDATE SET version = EXCLUDED.version
+        """, [name])
+
+    @api.model
+    def _get(self, *names):
+        """ Huidige versies van ``names`` als tuple, in één query. """
+        self.env.cr.execute(f"SELECT name, version FROM {self._table} WHERE name IN %s", [names])
+        versions = dict(self.env.cr.fetchall())
+        return tuple(versions.get(name, 0) for name in names)
@@ -0,0 +1,168 @@
+import io
+import logging
+import threading
+import time
+import zipfile
+from datetime import timedelta
+
+from lxml import etree
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+try:
+    from pdfminer.high_level import extract_text as pdf_extract_text
+except ImportError:
+    pdf_extract_text = None
+    _logger.warning("pdfminer.six is niet geïnstalleerd: PDF-cv's worden niet geïndexeerd.")
+
+CV_BATCH_SIZE = 20
+CV_MAX_ATTEMPTS = 3
+CV_RETRY_DELAY = timedelta(minutes=10)
+# Een cronrun stopt na deze tijd zodat de worker zijn tijdslimiet niet overschrijdt
+CV_TIME_BUDGET = 240
+
+PDF_MIMETYPE = 'application/pdf'
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+CV_MIMETYPES = (PDF_MIMETYPE, DOCX_MIMETYPE)
+DOCX_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def extract_cv_text(raw, mimetype):
+    """ Platte tekst uit een PDF- of DOCX-bestand. """
+    if mimetype == PDF_MIMETYPE:
+        if pdf_extract_text is None:
+            raise UnsupportedCVError("pdfminer.six is niet geïnstalleerd")
+        return pdf_extract_text(io.BytesIO(raw))
+    if mimetype == DOCX_MIMETYPE:
+        with zipfile.ZipFile(io.BytesIO(raw)) as docx:
+            root = etree.fromstring(docx.read('word/document.xml'))
+        return '\n'.join(
+            ''.join(node.text or '' for node in paragraph.iter(DOCX_NS + 't'))
+            for paragraph in root.iter(DOCX_NS + 'p')
+        )
+    raise UnsupportedCVError(f"Bestandstype {mimetype} wordt niet ondersteund")
+
+
+class UnsupportedCVError(Exception):
+    pass
+
+
+class CVExtractionJob(models.Model):
+    """ Wachtrij voor het uitlezen van cv's.
+
+    Workers nemen taken met ``FOR UPDATE SKIP LOCKED``: meerdere cronrecords
+    die ``_cron_process_queue`` aanroepen, verwerken de wachtrij dus parallel
+    zonder elkaars taken te nemen.
+    """
+    _name = 'wiz.recruitment.talentpool.cv.job'
+    _description = 'CV-extractietaak'
+    _order = 'id'
+
+    talent_id = fields.Many2one('wiz.recruitment.talentpool.talent', required=True, index=True, ondelete='cascade')
+    attachment_id = fields.Many2one('ir.attachment', string="CV-bestand", required=True, ondelete='cascade')
+    state = fields.Selection([
+        ('pending', "In wachtrij"),
+        ('done', "Verwerkt"),
+        ('failed', "Mislukt"),
+    ], default='pending', required=True, index=True)
+    attempts = fields.Integer("Pogingen", default=0)
+    next_attempt = fields.Datetime("Volgende poging")
+    error = fields.Text("Fout")
+    processed_date = fields.Datetime("Verwerkt op")
+
+    _sql_constraints = [
+        ('talent_unique', 'unique(talent_id)', "Er is al een cv-taak voor dit talent."),
+    ]
+
+    @api.model
+    def _enqueue(self, attachment_by_talent):
+        """ Zet talenten (opnieuw) in de wachtrij, één taak per talent. """
+        if not attachment_by_talent:
+            return self.browse()
+        existing = self.search([('talent_id', 'in', list(attachment_by_talent))])
+        for job in existing.filtered(lambda j: j.attachment_id.id != attachment_by_talent[j.talent_id.id]):
+            job.attachment_id = attachment_by_talent[job.talent_id.id]
+        existing.write({'state': 'pending', 'attempts': 0, 'next_attempt': False, 'error': False})
+        known = set(existing.talent_id.ids)
+        jobs = existing | self.create([
+            {'talent_id': talent_id, 'attachment_id': attachment_id}
+            for talent_id, attachment_id in attachment_by_talent.items()
+            if talent_id not in known
+        ])
+        self.env.ref('wiz_recruitment_talentpool.ir_cron_process_cv_queue')._trigger()
+        return jobs
+
+    @api.model
+    def _cron_process_queue(self, batch_size=CV_BATCH_SIZE, time_budget=CV_TIME_BUDGET):
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        started = time.monotonic()
+        while time.monotonic() - started < time_budget:
+            jobs = self._acquire_batch(batch_size)
+            if not jobs:
+                break
+            jobs._process()
+            if not auto_commit:
+                break
+            # De commit geeft ook de rijvergrendeling vrij
+            self.env.cr.commit()
+
+    @api.model
+    def _acquire_batch(self, batch_size):
+        self.env.cr.execute("""
+            SELECT id
+              FROM wiz_recruitment_talentpool_cv_job
+             WHERE state = 'pending'
+               AND (next_attempt IS NULL OR next_attempt <= (now() AT TIME ZONE 'UTC'))
+          ORDER BY id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+        """, (batch_size,))
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    def _process(self):
+        for job in self:
+            try:
+                with self.env.cr.savepoint():
+                    text = extract_cv_text(job.attachment_id.raw, job.attachment_id.mimetype)
+                    job.talent_id.write({'cv_text': text.strip()})
+                    job.write({'state': 'done', 'error': False, 'processed_date': fields.Datetime.now()})
+            except UnsupportedCVError as e:
+                job.write({'state': 'failed', 'error': str(e), 'attempts': job.attempts + 1})
+            except Exception as e:
+                _logger.warning("Cv van talent %s kon niet uitgelezen worden: %s", job.talent_id.id, e)
+                attempts = job.attempts + 1
+                job.write({
+                    'state': 'failed' if attempts >= CV_MAX_ATTEMPTS else 'pending',
+                    'attempts': attempts,
+                    'next_attempt': fields.Datetime.now() + CV_RETRY_DELAY * attempts,
+                    'error': str(e),
+                })
+
+
+class Talent(models.Model):
+    _inherit = 'wiz.recruitment.talentpool.talent'
+
+    cv_job_ids = fields.One2many('wiz.recruitment.talentpool.cv.job', 'talent_id', string="CV-verwerking")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        talents = super().create(vals_list)
+        talents.filtered('cv_attachment_id')._enqueue_cv_extraction()
+        return talents
+
+    def write(self, vals):
+        res = super().write(vals)
+        if vals.get('cv_attachment_id'):
+            self._enqueue_cv_extraction()
+        return res
+
+    def _enqueue_cv_extraction(self):
+        """ Plan het uitlezen van het cv; parsen gebeurt nooit tijdens het opladen zelf. """
+        attachment_by_talent = {talent.id: talent.cv_attachment_id.id for talent in self if talent.cv_attachment_id}
+        return self.env['wiz.recruitment.talentpool.cv.job'].sudo()._enqueue(attachment_by_talent)
+
+    def action_reindex_cv(self):
+        """ Zet de cv's van de geselecteerde talenten opnieuw in de wachtrij. """
+        self._enqueue_cv_extraction()
@@ -1,5 +1,169 @@
-from odoo import models
+from datetime import timedelta
 
-class TalentPoolDashboard(models.Model):
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api
+
+KPI_CODES = [
+    ('pool_size', "Talenten in de pool"),
+    ('inactive', "Inactieve talenten"),
+    ('conversion_rate', "Conversiegraad sollicitant naar talent (%)"),
+    ('applications_per_talent', "Sollicitaties per talent"),
+    ('new_talents_week', "Nieuwe talenten per week"),
+    ('skill', "Skillverdeling"),
+]
+
+# Aantal weken dat bij een incrementele verversing opnieuw wordt berekend
+WEEKS_TO_REFRESH = 2
+
+
+class TalentPoolDashboardKpi(models.Model):
+    _name = 'wiz.recruitment.talentpool.dashboard.kpi'
+    _description = 'Recruitment Talent Pool KPI-snapshot'
+    _order = 'code, period_start desc, value desc, label'
+
+    code = fields.Selection(KPI_CODES, required=True, index=True)
+    period_start = fields.Date("Week")
+    label = fields.Char("Label")
+    value = fields.Float("Waarde")
+    refresh_date = fields.Datetime("Bijgewerkt op")
+
+    def init(self):
+        # Unieke sleutel voor de upserts van de snapshot
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS wiz_recruitment_talentpool_dashboard_kpi_key_uniq
+                ON wiz_recruitment_talentpool_dashboard_kpi
+                   (code, COALESCE(period_start, '1970-01-01'), COALESCE(label, ''))
+        """)
+
+    def _upsert(self, code, rows, now):
+        """ Schrijf (period_start, label, value)-rijen voor een KPI in één statement weg. """
+        if not rows:
+            return
+        execute_values(self.env.cr._obj, """
+            INSERT INTO wiz_recruitment_talentpool_dashboard_kpi
+                   (code, period_start, label, value, refresh_date,
+                    create_uid, create_date, write_uid, write_date)
+            VALUES %s
+            ON CONFLICT (code, COALESCE(period_start, '1970-01-01'), COALESCE(label, ''))
+            DO UPDATE SET value = EXCLUDED.value,
+                          refresh_date = EXCLUDED.refresh_date,
+                          write_uid = EXCLUDED.write_uid,
+                          write_date = EXCLUDED.write_date
+        """, [
+            (code, period_start, label, value or 0.0, now, self.env.uid, now, self.env.uid, now)
+            for period_start, label, value in rows
+        ], page_size=1000)
+
+    @api.model
+    def _refresh_snapshot(self, full=False):
+        """ Ververs de KPI-snapshot met SQL-aggregaten (aangeroepen door de cron). """
+        cr = self.env.cr
+        now = fields.Datetime.now()
+        self.flush_model()
+        self.env['wiz.recruitment.talentpool.talent'].flush_model()
+        self.env['hr.applicant'].flush_model(['talent_id'])
+        self.env['recruitment.skill'].flush_model()
+        self.env['wiz.recruitment.talentpool.skill.catalog'].flush_model()
+
+        # Kerncijfers: telkens één aggregaat
+        cr.execute("""
+            SELECT count(*), count(*) FILTER (WHERE inactive_tag)
+              FROM wiz_recruitment_talentpool_talent
+        """)
+        pool_size, inactive = cr.fetchone()
+        cr.execute("""
+            SELECT count(*), count(talent_id)
+              FROM hr_applicant
+        """)
+        applicants, converted = cr.fetchone()
+        self._upsert('pool_size', [(None, None, pool_size)], now)
+        self._upsert('inactive', [(None, None, inactive)], now)
+        self._upsert('conversion_rate', [(None, None, applicants and 100.0 * converted / applicants)], now)
+        self._upsert('applications_per_talent', [(None, None, pool_size and converted / pool_size)], now)
+
+        # Nieuwe talenten per week: enkel de laatste weken opnieuw berekenen
+        since = None
+        if not full:
+            cr.execute("""
+                SELECT max(period_start)
+                  FROM wiz_recruitment_talentpool_dashboard_kpi
+                 WHERE code = 'new_talents_week'
+            """)
+            last_week = cr.fetchone()[0]
+            since = last_week and last_week - timedelta(weeks=WEEKS_TO_REFRESH - 1)
+        cr.execute("""
+            SELECT date_trunc('week', creation_date)::date, NULL, count(*)
+              FROM wiz_recruitment_talentpool_talent
+             WHERE creation_date IS NOT NULL
+               AND (%(since)s::date IS NULL OR creation_date >= %(since)s::date)
+          GROUP BY 1
+        """, {'since': since})
+        self._upsert('new_talents_week', cr.fetchall(), now)
+
+        # Skillverdeling: aantal talenten per catalogusskill (join op id, geen tekstgroepering)
+        cr.execute("""
+            SELECT NULL, c.name, count(DISTINCT s.talent_id)
+              FROM recruitment_skill s
+              JOIN wiz_recruitment_talentpool_skill_catalog c ON c.id = s.catalog_id
+             WHERE s.talent_id IS NOT NULL
+          GROUP BY c.id, c.name
+        """)
+        skill_rows = cr.fetchall()
+        self._upsert('skill', skill_rows, now)
+        cr.execute("""
+            DELETE FROM wiz_recruitment_talentpool_dashboard_kpi
+             WHERE code = 'skill' AND NOT (label = ANY(%s::varchar[]))
+        """, ([row[1] for row in skill_rows],))
+        self.invalidate_model()
+        return True
+
+
+class TalentPoolDashboard(models.TransientModel):
     _name = 'wiz.recruitment.talentpool.dashboard'
     _description = 'Recruitment Talent Pool Dashboard'
+
+    pool_size = fields.Integer("Talenten in de pool", compute='_compute_kpis')
+    inactive_count = fields.Integer("Inactieve talenten", compute='_compute_kpis')
+    conversion_rate = fields.Float("Conversiegraad (%)", digits=(16, 1), compute='_compute_kpis')
+    applications_per_talent = fields.Float("Sollicitaties per talent", digits=(16, 2), compute='_compute_kpis')
+    refresh_date = fields.Datetime("Laatst bijgewerkt", compute='_compute_kpis')
+    weekly_kpi_ids = fields.Many2many('wiz.recruitment.talentpool.dashboard.kpi', compute='_compute_kpis')
+    skill_kpi_ids = fields.Many2many('wiz.recruitment.talentpool.dashboard.kpi', compute='_compute_kpis')
+    perf_summary_ids = fields.Many2many('wiz.recruitment.talentpool.perf.summary', compute='_compute_perf_summary')
+
+    def _compute_kpis(self):
+        # Enkel de snapshot lezen; niets wordt hier herberekend
+        Kpi = self.env['wiz.recruitment.talentpool.dashboard.kpi']
+        scalars = {
+            kpi['code']: kpi
+            for kpi in Kpi.search_read(
+                [('code', 'in', ['pool_size', 'inactive', 'conversion_rate', 'applications_per_talent'])],
+                ['code', 'value', 'refresh_date'],
+            )
+        }
+        weekly = Kpi.search([('code', '=', 'new_talents_week')], limit=26)
+        skills = Kpi.search([('code', '=', 'skill')], order='value desc, label', limit=25)
+        for dashboard in self:
+            dashboard.pool_size = scalars.get('pool_size', {}).get('value', 0)
+            dashboard.inactive_count = scalars.get('inactive', {}).get('value', 0)
+            dashboard.conversion_rate = scalars.get('conversion_rate', {}).get('value', 0.0)
+            dashboard.applications_per_talent = scalars.get('applications_per_talent', {}).get('value', 0.0)
+            dashboard.refresh_date = scalars.get('pool_size', {}).get('refresh_date', False)
+            dashboard.weekly_kpi_ids = weekly
+            dashboard.skill_kpi_ids = skills
+
+    def _compute_perf_summary(self):
+        Summary = self.env['wiz.recruitment.talentpool.perf.summary']
+        summary = Summary.search([]) if Summary.check_access_rights('read', raise_exception=False) else Summary
+        for dashboard in self:
+            dashboard.perf_summary_ids = summary
+
+    def action_refresh(self):
+        self.env['wiz.recruitment.talentpool.dashboard.kpi'].sudo()._refresh_snapshot()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'view_mode': 'form',
+            'target': 'new',
+        }
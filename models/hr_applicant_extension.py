@@ -1,15 +1,66 @@
-from odoo import models, fields, api
+import threading
+from collections import defaultdict
 from datetime import date
-    
+
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api
+
+from .cv_extraction import CV_MIMETYPES
+from .instrumentation import instrumented
+from .talent import normalize_email, normalize_linkedin
+
+BULK_CONVERT_BATCH_SIZE = 1000
+# Velden van een sollicitatie die het talent in het portaal ziet
+PORTAL_APPLICATION_FIELDS = {'talent_id', 'active', 'name', 'job_id', 'stage_id'}
+
+# Profielvelden die bij een sollicitatie van het talent worden gekopieerd
+TALENT_CHILD_FIELDS = {
+    'recruitment.education': ['name', 'institute', 'start_date', 'end_date'],
+    'recruitment.experience': ['name', 'company', 'start_date', 'end_date', 'description'],
+    'recruitment.skill': ['name', 'level', 'catalog_id'],
+}
+
+
 class Applicant(models.Model):
     _inherit = 'hr.applicant'
     
     # nieuwe velden en uitbreidingen
-    talent_id = fields.Many2one('wiz.recruitment.talentpool.talent', string="Talent")
+    talent_id = fields.Many2one('wiz.recruitment.talentpool.talent', string="Talent", index=True)
     education_ids = fields.One2many('recruitment.education', 'applicant_id')
     experience_ids = fields.One2many('recruitment.experience', 'applicant_id')
     skill_ids = fields.One2many('recruitment.skill', 'applicant_id')
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        applicants = super().create(vals_list)
+        applicants._refresh_talent_application_stats(applicants.talent_id)
+        return applicants
+
+    def write(self, vals):
+        if not PORTAL_APPLICATION_FIELDS & vals.keys():
+            return super().write(vals)
+        talents = self.talent_id
+        result = super().write(vals)
+        if 'talent_id' in vals or 'active' in vals:
+            self._refresh_talent_application_stats(talents | self.talent_id)
+        else:
+            # Enkel de sollicitatielijst op /my/talent is veranderd
+            talents.sudo()._bump_portal_version()
+        return result
+
+    def unlink(self):
+        talents = self.talent_id
+        result = super().unlink()
+        self._refresh_talent_application_stats(talents)
+        return result
+
+    def _refresh_talent_application_stats(self, talents):
+        # Bij bulkbewerkingen wordt dit één keer op het einde gedaan
+        if not self.env.context.get('talentpool_defer_application_stats'):
+            talents.sudo()._refresh_application_stats()
+
+    @instrumented
     def action_convert_to_talent(self):
         Talent = self.env['wiz.recruitment.talentpool.talent'].sudo()
         for applicant in self:
@@ -25,11 +76,8 @@ class Applicant(models.Model):
                     }
                 }
 
-            existing = Talent.search([
-                '|',
-                ('email', '=', applicant.email_from),
-                ('linkedin_profile', '=', applicant.linkedin_profile)
-            ], limit=1)
+            existing = Talent._search_by_dedup_keys(
+                [applicant.email_from], [applicant.linkedin_profile], limit=1)
 
             if existing:
                 return {
@@ -53,15 +101,11 @@ class Applicant(models.Model):
                 'last_update_date': date.today(),
             })
 
-            # Bijlagen koppelen
-            attachments = self.env['ir.attachment'].search([
-                ('res_model', '=', 'hr.applicant'),
-                ('res_id', '=', applicant.id)
-            ])
-            new_talent.attachment_ids = [(4, att.id) for att in attachments]
-
             applicant.talent_id = new_talent.id
 
+            # Bijlagen koppelen
+            applicant._share_attachments_with_talents()
+
             return {
                 'type': 'ir.actions.client',
                 'tag': 'display_notification',
@@ -73,26 +117,58 @@ class Applicant(models.Model):
                 }
             }
 
+    @instrumented
     def action_bulk_convert_to_talent(self):
-        Talent = self.env['wiz.recruitment.talentpool.talent'].sudo()
         created = 0
-        skipped = 0
+        # Grote selecties in blokken verwerken met een commit per blok, zodat
+        # een import van duizenden sollicitanten geen gigantische transactie wordt.
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        for offset in range(0, len(self), BULK_CONVERT_BATCH_SIZE):
+            batch = self[offset:offset + BULK_CONVERT_BATCH_SIZE]
+            created += batch._bulk_convert_batch()
+            if auto_commit:
+                self.env.cr.commit()
+        skipped = len(self) - created
 
-        for applicant in self:
-            if applicant.talent_id:
-                skipped += 1
-                continue
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': "Bulkconversie voltooid",
+                'message': f"{created} talenten aangemaakt, {skipped} overgeslagen.",
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+    def _bulk_convert_batch(self):
+        """ Zet één blok sollicitanten om; geeft het aantal nieuwe talenten terug. """
+        Talent = self.env['wiz.recruitment.talentpool.talent'].sudo()
+        todo = self.filtered(lambda a: not a.talent_id and normalize_email(a.email_from))
 
-            existing = Talent.search([
-                ('email', '=', applicant.email_from)
-            ], limit=1)
+        # Bestaande talenten voor alle e-mailadressen en LinkedIn-profielen in één query ophalen
+        existing = Talent._search_by_dedup_keys(todo.mapped('email_from'), todo.mapped('linkedin_profile'))
+        talent_by_email = {talent.email_key: talent for talent in existing}
+        talent_by_linkedin = {talent.linkedin_key: talent for talent in existing if talent.linkedin_key}
 
-            if existing:
-                applicant.talent_id = existing.id
-                skipped += 1
+        # Ontbrekende talenten in één create aanmaken (één per sleutel)
+        vals_list = []
+        # E-mailadressen die via een LinkedIn-profiel naar een nog aan te maken talent wijzen
+        pending_linkedin = {}
+        for applicant in todo:
+            email_key = normalize_email(applicant.email_from)
+            linkedin_key = normalize_linkedin(applicant.linkedin_profile)
+            if email_key in talent_by_email:
                 continue
-
-            new_talent = Talent.create({
+            if linkedin_key in talent_by_linkedin:
+                talent_by_email[email_key] = talent_by_linkedin[linkedin_key]
+                if talent_by_email[email_key] is None:
+                    pending_linkedin[email_key] = linkedin_key
+                continue
+            talent_by_email[email_key] = None
+            if linkedin_key:
+                talent_by_linkedin[linkedin_key] = None
+            vals_list.append({
                 'name': applicant.partner_name or applicant.name,
                 'email': applicant.email_from,
                 'linkedin_profile': applicant.linkedin_profile,
@@ -100,41 +176,110 @@ class Applicant(models.Model):
                 'last_update_date': date.today(),
                 'notes': applicant.description,
             })
+        new_talents = Talent.create(vals_list)
+        talent_by_email.update({talent.email_key: talent for talent in new_talents})
+        talent_by_linkedin.update({talent.linkedin_key: talent for talent in new_talents if talent.linkedin_key})
+        for email_key, linkedin_key in pending_linkedin.items():
+            talent_by_email[email_key] = talent_by_linkedin.get(linkedin_key)
 
-            applicant.talent_id = new_talent.id
-            created += 1
+        # Sollicitanten gegroepeerd per talent koppelen
+        applicant_ids_by_talent = defaultdict(list)
+        for applicant in todo:
+            talent = (talent_by_email.get(normalize_email(applicant.email_from))
+                      or talent_by_linkedin.get(normalize_linkedin(applicant.linkedin_profile)))
+            if talent:
+                applicant_ids_by_talent[talent].append(applicant.id)
+        deferred = self.with_context(talentpool_defer_application_stats=True)
+        for talent, applicant_ids in applicant_ids_by_talent.items():
+            deferred.browse(applicant_ids).write({'talent_id': talent.id})
+        todo.talent_id.sudo()._refresh_application_stats()
+        todo._share_attachments_with_talents()
 
-        return {
-            'type': 'ir.actions.client',
-            'tag': 'display_notification',
-            'params': {
-                'title': "Bulkconversie voltooid",
-                'message': f"{created} talenten aangemaakt, {skipped} overgeslagen.",
-                'type': 'success',
-                'sticky': False,
-            }
-        }
+        return len(new_talents)
+
+    def _share_attachments_with_talents(self):
+        """ Hang de bijlagen van deze sollicitanten ook aan hun talent.
+
+        Eén INSERT ... SELECT voor de hele selectie: de nieuwe bijlagen
+        verwijzen naar hetzelfde bestand (store_fname), zodat de filestore
+        niets dupliceert. Bijlagen die het talent al heeft, worden overgeslagen.
+        Talenten zonder cv krijgen de eerste PDF/DOCX als cv_attachment_id.
+        """
+        applicants = self.filtered('talent_id')
+        if not applicants:
+            return
+        Talent = self.env['wiz.recruitment.talentpool.talent']
+        self.env['ir.attachment'].flush_model()
+        self.flush_recordset(['talent_id'])
+        self.env.cr.execute("""
+            INSERT INTO ir_attachment (name, description, res_model, res_id, company_id, type, url, public,
+                                       db_datas, store_fname, file_size, checksum, mimetype, index_content,
+                                       create_uid, create_date, write_uid, write_date)
+            SELECT a.name, a.description, %(talent_model)s, ap.talent_id, a.company_id, a.type, a.url, a.public,
+                   a.db_datas, a.store_fname, a.file_size, a.checksum, a.mimetype, a.index_content,
+                   %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM ir_attachment a
+              JOIN hr_applicant ap ON ap.id = a.res_id
+             WHERE a.res_model = 'hr.applicant'
+               AND a.res_field IS NULL
+               AND a.res_id IN %(applicant_ids)s
+               AND NOT EXISTS (
+                       SELECT 1
+                         FROM ir_attachment t
+                        WHERE t.res_model = %(talent_model)s
+                          AND t.res_id = ap.talent_id
+                          AND t.res_field IS NULL
+                          AND t.name = a.name
+                          AND t.checksum IS NOT DISTINCT FROM a.checksum)
+          ORDER BY a.id
+         RETURNING id, res_id, mimetype
+        """, {
+            'talent_model': Talent._name,
+            'applicant_ids': tuple(applicants.ids),
+            'uid': self.env.uid,
+        })
+        created = self.env.cr.fetchall()
+        cv_by_talent = {}
+        for attachment_id, talent_id, mimetype in created:
+            if mimetype in CV_MIMETYPES:
+                cv_by_talent.setdefault(talent_id, attachment_id)
+        self.env['wiz.recruitment.talentpool.change']._record(
+            'ir.attachment', 'create', [(attachment_id, talent_id) for attachment_id, talent_id, _mimetype in created])
+        self.env['ir.attachment'].invalidate_model()
+
+        talents = Talent.sudo().browse(list(cv_by_talent)).filtered(lambda t: not t.cv_attachment_id)
+        if talents:
+            execute_values(self.env.cr._obj, """
+                UPDATE wiz_recruitment_talentpool_talent t
+                   SET cv_attachment_id = v.attachment_id
+                  FROM (VALUES %s) AS v(id, attachment_id)
+                 WHERE t.id = v.id
+            """, [(talent.id, cv_by_talent[talent.id]) for talent in talents])
+            talents.invalidate_recordset(['cv_attachment_id'])
+            talents._enqueue_cv_extraction()
+
+    @instrumented
     def copy_talent_data_to_applicant(self, talent):
-        for record in talent.education_ids:
-            self.env['recruitment.education'].create({
-                'name': record.name,
-                'institute': record.institute,
-                'start_date': record.start_date,
-                'end_date': record.end_date,
-                'applicant_id': self.id,
-            })
-        for record in talent.experience_ids:
-            self.env['recruitment.experience'].create({
-                'name': record.name,
-                'company': record.company,
-                'start_date': record.start_date,
-                'end_date': record.end_date,
-                'description': record.description,
-                'applicant_id': self.id,
-            })
-        for record in talent.skill_ids:
-            self.env['recruitment.skill'].create({
-                'name': record.name,
-                'level': record.level,
-                'applicant_id': self.id,
-            })
+        self.ensure_one()
+        self.copy_talents_data_to_applicants(talent)
+
+    def copy_talents_data_to_applicants(self, talents):
+        """ Kloon het profiel van talents[i] naar self[i]: per model één read en één create. """
+        if len(self) != len(talents):
+            raise ValueError("Er moeten evenveel talenten als sollicitanten zijn.")
+        applicant_ids_by_talent = defaultdict(list)
+        for applicant, talent in zip(self, talents):
+            applicant_ids_by_talent[talent.id].append(applicant.id)
+
+        for model, fnames in TALENT_CHILD_FIELDS.items():
+            records = self.env[model].search_read(
+                [('talent_id', 'in', list(applicant_ids_by_talent))],
+                fnames + ['talent_id'], load=None,
+            )
+            vals_list = []
+            for record in records:
+                talent_id = record.pop('talent_id')
+                record.pop('id')
+                for applicant_id in applicant_ids_by_talent[talent_id]:
+                    vals_list.append(dict(record, applicant_id=applicant_id))
+            self.env[model].create(vals_list)
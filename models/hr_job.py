@@ -0,0 +1,63 @@
+from odoo import models, api
+
+# Cacheversie van de vacatures en fases die het portaal toont
+PORTAL_JOBS_VERSION = 'portal_jobs'
+# Velden van vacatures en fases die in de gecachte portaalpagina's staan
+PORTAL_JOB_FIELDS = {'name', 'active', 'is_published', 'website_published'}
+PORTAL_STAGE_FIELDS = {'name'}
+
+
+class HrJob(models.Model):
+    _inherit = 'hr.job'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        jobs = super().create(vals_list)
+        self._bump_portal_job_version()
+        return jobs
+
+    def write(self, vals):
+        res = super().write(vals)
+        if PORTAL_JOB_FIELDS & vals.keys():
+            self._bump_portal_job_version()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self._bump_portal_job_version()
+        return res
+
+    @api.model
+    def _bump_portal_job_version(self):
+        self.env['wiz.recruitment.talentpool.cache.version']._bump(PORTAL_JOBS_VERSION)
+
+    @api.model
+    def _get_portal_job_version(self):
+        """ Versie van de vacatures en fases zoals het portaal ze toont.
+
+        Eén opzoeking van een teller die in dezelfde transactie als een nieuwe,
+        hernoemde, (de)gepubliceerde of verwijderde vacature of fase opgehoogd wordt.
+        """
+        version, = self.env['wiz.recruitment.talentpool.cache.version']._get(PORTAL_JOBS_VERSION)
+        return version
+
+
+class RecruitmentStage(models.Model):
+    _inherit = 'hr.recruitment.stage'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        stages = super().create(vals_list)
+        self.env['hr.job']._bump_portal_job_version()
+        return stages
+
+    def write(self, vals):
+        res = super().write(vals)
+        if PORTAL_STAGE_FIELDS & vals.keys():
+            self.env['hr.job']._bump_portal_job_version()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env['hr.job']._bump_portal_job_version()
+        return res
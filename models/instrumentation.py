@@ -0,0 +1,200 @@
+import atexit
+import functools
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api, tools, SUPERUSER_ID
+from odoo.http import request
+from odoo.modules.registry import Registry
+
+_logger = logging.getLogger(__name__)
+
+# Buffer per worker wordt weggeschreven na zoveel seconden of metingen
+PERF_FLUSH_INTERVAL = 60
+PERF_FLUSH_SIZE = 500
+PERF_RETENTION = timedelta(days=30)
+PERF_SUMMARY_PERIOD = '7 days'
+
+_buffer_lock = threading.Lock()
+_buffer = defaultdict(list)
+_last_flush = {}
+# Proces waarvoor de achtergrondflush loopt (na een fork opnieuw starten)
+_flusher_pid = None
+
+
+def instrumented(func):
+    """ Meet wandtijd, aantal queries en records van een portaalroute of modelactie. """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        is_model = isinstance(self, models.BaseModel)
+        env = self.env if is_model else request.env
+        start, queries = time.perf_counter(), getattr(env.cr, 'sql_log_count', 0)
+        try:
+            result = func(self, *args, **kwargs)
+            if getattr(result, 'is_qweb', False):
+                # Lazy QWeb-response al renderen, zodat de meting het template omvat
+                result.flatten()
+            return result
+        finally:
+            _add_sample(env, (
+                f'{self._name}.{func.__name__}' if is_model else func.__qualname__,
+                'action' if is_model else 'route',
+                fields.Datetime.now(),
+                (time.perf_counter() - start) * 1000,
+                getattr(env.cr, 'sql_log_count', 0) - queries,
+                len(self) if is_model else 0,
+            ))
+    return wrapper
+
+
+def _add_sample(env, sample):
+    dbname = env.cr.dbname
+    now = time.monotonic()
+    _ensure_flusher()
+    with _buffer_lock:
+        _buffer[dbname].append(sample)
+        last_flush = _last_flush.setdefault(dbname, now)
+        if len(_buffer[dbname]) < PERF_FLUSH_SIZE and now - last_flush < PERF_FLUSH_INTERVAL:
+            return
+        samples, _buffer[dbname] = _buffer[dbname], []
+        _last_flush[dbname] = now
+    _flush_samples(env, samples)
+
+
+def _flush_samples(env, samples):
+    if not samples:
+        return
+    if getattr(threading.current_thread(), 'testing', False):
+        # In tests in de lopende transactie, zodat alles mee teruggedraaid wordt
+        env['wiz.recruitment.talentpool.perf.sample']._insert_samples(env.cr, samples)
+        return
+    try:
+        # Eigen cursor: de meting mag niet afhangen van de (mogelijk mislukte) requesttransactie
+        with env.registry.cursor() as cr:
+            env['wiz.recruitment.talentpool.perf.sample']._insert_samples(cr, samples)
+    except Exception:
+        _logger.warning("Prestatiemetingen konden niet weggeschreven worden", exc_info=True)
+
+
+def _ensure_flusher():
+    """ Start per proces een thread die de buffers periodiek wegschrijft.
+
+    Zo belanden metingen van een worker die geen requests meer krijgt toch
+    in de database, en bij het afsluiten (recyclen) van de worker ook.
+    """
+    global _flusher_pid
+    if _flusher_pid == os.getpid() or getattr(threading.current_thread(), 'testing', False):
+        return
+    with _buffer_lock:
+        if _flusher_pid == os.getpid():
+            return
+        if _flusher_pid is None:
+            atexit.register(_flush_all)
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, name='talentpool.perf.flush', daemon=True).start()
+
+
+def _flush_loop():
+    while True:
+        time.sleep(PERF_FLUSH_INTERVAL)
+        _flush_all(max_age=PERF_FLUSH_INTERVAL)
+
+
+def _flush_all(max_age=0):
+    """ Schrijf de buffers weg die ouder zijn dan ``max_age`` seconden, elk via een eigen cursor. """
+    now = time.monotonic()
+    with _buffer_lock:
+        pending = {}
+        for dbname, samples in _buffer.items():
+            if samples and now - _last_flush.get(dbname, now) >= max_age:
+                pending[dbname], _buffer[dbname] = samples, []
+                _last_flush[dbname] = now
+    for dbname, samples in pending.items():
+        try:
+            with Registry(dbname).cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                env['wiz.recruitment.talentpool.perf.sample']._insert_samples(cr, samples)
+        except Exception:
+            _logger.warning("Prestatiemetingen voor %s konden niet weggeschreven worden", dbname, exc_info=True)
+
+
+class PerfSample(models.Model):
+    """ Ruwe metingen van portaalroutes en talentacties. """
+    _name = 'wiz.recruitment.talentpool.perf.sample'
+    _description = 'Prestatiemeting'
+    _log_access = False
+    _order = 'sample_date desc'
+
+    name = fields.Char("Meetpunt", required=True, index=True)
+    kind = fields.Selection([('route', "Portaalroute"), ('action', "Actie")], string="Soort", required=True)
+    sample_date = fields.Datetime("Tijdstip", required=True, index=True)
+    duration = fields.Float("Duur (ms)")
+    query_count = fields.Integer("Queries")
+    record_count = fields.Integer("Records")
+
+    @api.model
+    def _insert_samples(self, cr, samples):
+        execute_values(cr._obj, f"""
+            INSERT INTO {self._table} (name, kind, sample_date, duration, query_count, record_count)
+            VALUES %s
+        """, samples)
+
+    @api.model
+    def _cron_flush(self):
+        """ Buffer van het cronproces wegschrijven en oude metingen opruimen.
+
+        Workers schrijven hun eigen buffer weg via de achtergrondthread van
+        _ensure_flusher(); deze cron hoeft daar niet op te wachten.
+        """
+        with _buffer_lock:
+            samples, _buffer[self.env.cr.dbname] = _buffer[self.env.cr.dbname], []
+            _last_flush[self.env.cr.dbname] = time.monotonic()
+        if samples:
+            self._insert_samples(self.env.cr, samples)
+        self.env.cr.execute(f"DELETE FROM {self._table} WHERE sample_date < %s",
+                            [fields.Datetime.now() - PERF_RETENTION])
+
+
+class PerfSummary(models.Model):
+    """ Percentielen per meetpunt over de laatste week, voor het dashboard. """
+    _name = 'wiz.recruitment.talentpool.perf.summary'
+    _description = 'Prestatieoverzicht'
+    _auto = False
+    _order = 'duration_p90 desc'
+
+    name = fields.Char("Meetpunt", readonly=True)
+    kind = fields.Selection([('route', "Portaalroute"), ('action', "Actie")], string="Soort", readonly=True)
+    call_count = fields.Integer("Aanroepen", readonly=True)
+    duration_p50 = fields.Float("p50 (ms)", readonly=True)
+    duration_p90 = fields.Float("p90 (ms)", readonly=True)
+    duration_p99 = fields.Float("p99 (ms)", readonly=True)
+    duration_max = fields.Float("Max (ms)", readonly=True)
+    query_avg = fields.Float("Queries gem.", readonly=True)
+    query_max = fields.Integer("Queries max", readonly=True)
+    record_avg = fields.Float("Records gem.", readonly=True)
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(f"""
+            CREATE VIEW {self._table} AS (
+                SELECT row_number() OVER (ORDER BY name, kind) AS id,
+                       name, kind,
+                       count(*) AS call_count,
+                       percentile_cont(0.5) WITHIN GROUP (ORDER BY duration) AS duration_p50,
+                       percentile_cont(0.9) WITHIN GROUP (ORDER BY duration) AS duration_p90,
+                       percentile_cont(0.99) WITHIN GROUP (ORDER BY duration) AS duration_p99,
+                       max(duration) AS duration_max,
+                       avg(query_count) AS query_avg,
+                       max(query_count) AS query_max,
+                       avg(record_count) AS record_avg
+                  FROM wiz_recruitment_talentpool_perf_sample
+                 WHERE sample_date >= (now() AT TIME ZONE 'UTC') - interval '{PERF_SUMMARY_PERIOD}'
+              GROUP BY name, kind
+            )
+        """)
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from odoo import models, fields
+
+SIGNUP_RESET_VALIDITY = timedelta(days=1)
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    talentpool_talent_ids = fields.One2many(
+        'wiz.recruitment.talentpool.talent', 'portal_user_id', string="Talentprofiel"
+    )
+
+    def _talentpool_queue_signup_mail(self, invite=True):
+        """ Uitnodiging of wachtwoordreset in de mailwachtrij zetten (niet meteen versturen). """
+        users = self.filtered('email')
+        if not users:
+            return
+        if invite:
+            users.partner_id.signup_prepare(signup_type='signup')
+            template = self.env.ref('auth_signup.set_password_email')
+        else:
+            users.partner_id.signup_prepare(signup_type='reset',
+                                            expiration=fields.Datetime.now() + SIGNUP_RESET_VALIDITY)
+            template = self.env.ref('auth_signup.reset_password_email')
+        for user in users:
+            template.with_context(lang=user.lang).send_mail(
+                user.id, force_send=False, email_layout_xmlid='mail.mail_notification_light')
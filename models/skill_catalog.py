@@ -0,0 +1,230 @@
+from bisect import bisect_left
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import ValidationError
+
+AUTOCOMPLETE_LIMIT = 10
+# Cacheversie van de catalogus en aliassen, zie _get_lookup
+CATALOG_VERSION = 'skill_catalog'
+
+
+def normalize_skill(name):
+    """ Sleutel van een skill: kleine letters, enkele spaties. """
+    return ' '.join((name or '').lower().split())
+
+
+class SkillCatalog(models.Model):
+    """ Canonieke skills; vrije tekst uit het portaal wordt hierop afgebeeld. """
+    _name = 'wiz.recruitment.talentpool.skill.catalog'
+    _description = 'Skillcatalogus'
+    _order = 'name'
+    _rec_names_search = ['name', 'alias_ids.name']
+
+    name = fields.Char("Skill", required=True)
+    key = fields.Char("Sleutel", compute='_compute_key', store=True, index=True)
+    alias_ids = fields.One2many('wiz.recruitment.talentpool.skill.alias', 'catalog_id', string="Aliassen")
+    skill_count = fields.Integer("Aantal talenten", compute='_compute_skill_count')
+
+    _sql_constraints = [
+        ('key_unique', 'unique(key)', "Deze skill bestaat al in de catalogus."),
+    ]
+
+    @api.depends('name')
+    def _compute_key(self):
+        for record in self:
+            record.key = normalize_skill(record.name)
+
+    def _compute_skill_count(self):
+        counts = dict(self.env['recruitment.skill']._read_group(
+            [('catalog_id', 'in', self.ids), ('talent_id', '!=', False)], ['catalog_id'], ['talent_id:count_distinct']))
+        for record in self:
+            record.skill_count = counts.get(record, 0)
+
+    @api.constrains('key')
+    def _check_key_not_alias(self):
+        if self.env['wiz.recruitment.talentpool.skill.alias'].search_count([('key', 'in', self.mapped('key'))]):
+            raise ValidationError("Deze skill bestaat al als alias in de catalogus.")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['wiz.recruitment.talentpool.cache.version']._bump(CATALOG_VERSION)
+        return records
+
+    def write(self, vals):
+        keys = self.mapped('key') if 'name' in vals else None
+        res = super().write(vals)
+        if keys is not None and self.mapped('key') != keys:
+            self.env['wiz.recruitment.talentpool.cache.version']._bump(CATALOG_VERSION)
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env['wiz.recruitment.talentpool.cache.version']._bump(CATALOG_VERSION)
+        return res
+
+    @api.model
+    def _get_lookup(self):
+        """ Gesorteerde prefixindex en sleutel -> (catalogus-id, canonieke sleutel),
+        voor namen én aliassen.
+
+        De index wordt per worker gecachet onder de cacheversie van de catalogus:
+        een wijziging maakt enkel deze index ongeldig, niet de volledige ormcache.
+        Nieuwe skills uit _resolve verhogen de versie niet; _resolve vindt ze in
+        de database terug.
+        """
+        self.flush_model()
+        self.env['wiz.recruitment.talentpool.skill.alias'].flush_model()
+        version, = self.env['wiz.recruitment.talentpool.cache.version']._get(CATALOG_VERSION)
+        return self._get_lookup_at(version)
+
+    @tools.ormcache('version')
+    def _get_lookup_at(self, version):
+        self.env.cr.execute("""
+            SELECT c.key, c.id, c.name, c.key FROM wiz_recruitment_talentpool_skill_catalog c
+             UNION ALL
+            SELECT a.key, c.id, c.name, c.key
+              FROM wiz_recruitment_talentpool_skill_alias a
+              JOIN wiz_recruitment_talentpool_skill_catalog c ON c.id = a.catalog_id
+        """)
+        rows = self.env.cr.fetchall()
+        index = tuple(sorted((key, catalog_id, name) for key, catalog_id, name, _canonical in rows))
+        keys = {key: (catalog_id, canonical) for key, catalog_id, _name, canonical in rows}
+        return index, keys
+
+    @api.model
+    def _autocomplete(self, term, limit=AUTOCOMPLETE_LIMIT):
+        """ Catalogusskills waarvan de naam of een alias begint met ``term``. """
+        prefix = normalize_skill(term)
+        if not prefix:
+            return []
+        index, _keys = self._get_lookup()
+        result, seen = [], set()
+        for key, catalog_id, name in index[bisect_left(index, (prefix,)):]:
+            if not key.startswith(prefix) or len(result) >= limit:
+                break
+            if catalog_id not in seen:
+                seen.add(catalog_id)
+                result.append({'id': catalog_id, 'name': name})
+        return result
+
+    @api.model
+    def _canonical_keys(self, keys):
+        """ Beeld genormaliseerde termen af op de canonieke catalogussleutel. """
+        _index, lookup = self._get_lookup()
+        return {key: lookup[key][1] if key in lookup else key for key in keys}
+
+    @api.model
+    def _resolve(self, names):
+        """ Catalogus-id per genormaliseerde naam; onbekende skills worden in één keer aangemaakt. """
+        _index, lookup = self._get_lookup()
+        result = {}
+        missing = {}
+        for name in names:
+            key = normalize_skill(name)
+            if not key:
+                continue
+            if key in lookup:
+                result[key] = lookup[key][0]
+            else:
+                missing.setdefault(key, name.strip())
+        if missing:
+            # Een andere transactie kan dezelfde skill gelijktijdig aanmaken: de
+            # unieke sleutel beslist, bestaande skills worden daarna opgezocht
+            self.env.cr.execute(f"""
+                INSERT INTO {self._table} (key, name, create_uid, create_date, write_uid, write_date)
+                SELECT key, name, %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+                  FROM unnest(%(keys)s::varchar[], %(names)s::varchar[]) AS v(key, name)
+                    ON CONFLICT (key) DO NOTHING
+             RETURNING key, id
+            """, {'uid': self.env.uid, 'keys': list(missing), 'names': list(missing.values())})
+            result.update(self.env.cr.fetchall())
+            existing = [key for key in missing if key not in result]
+            if existing:
+                self.env.cr.execute(f"SELECT key, id FROM {self._table} WHERE key = ANY(%s)", [existing])
+                result.update(self.env.cr.fetchall())
+        return result
+
+
+class SkillAlias(models.Model):
+    _name = 'wiz.recruitment.talentpool.skill.alias'
+    _description = 'Skillalias'
+    _order = 'name'
+
+    name = fields.Char("Alias", required=True)
+    key = fields.Char("Sleutel", compute='_compute_key', store=True, index=True)
+    catalog_id = fields.Many2one('wiz.recruitment.talentpool.skill.catalog', string="Skill",
+                                 required=True, ondelete='cascade', index=True)
+
+    _sql_constraints = [
+        ('key_unique', 'unique(key)', "Deze alias bestaat al."),
+    ]
+
+    @api.depends('name')
+    def _compute_key(self):
+        for record in self:
+            record.key = normalize_skill(record.name)
+
+    @api.constrains('key')
+    def _check_key_not_catalog(self):
+        if self.env['wiz.recruitment.talentpool.skill.catalog'].search_count([('key', 'in', self.mapped('key'))]):
+            raise ValidationError("Deze alias bestaat al als skill in de catalogus.")
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        aliases = super().create(vals_list)
+        aliases._remap_skills()
+        self.env['wiz.recruitment.talentpool.cache.version']._bump(CATALOG_VERSION)
+        return aliases
+
+    def write(self, vals):
+        result = super().write(vals)
+        if {'name', 'catalog_id'} & vals.keys():
+            self._remap_skills()
+            self.env['wiz.recruitment.talentpool.cache.version']._bump(CATALOG_VERSION)
+        return result
+
+    def unlink(self):
+        res = super().unlink()
+        self.env['wiz.recruitment.talentpool.cache.version']._bump(CATALOG_VERSION)
+        return res
+
+    def _remap_skills(self):
+        """ Bestaande skills met deze alias als naam naar de canonieke skill laten wijzen. """
+        self.flush_recordset()
+        self.env['recruitment.skill'].flush_model(['name', 'catalog_id'])
+        self.env.cr.execute("""
+            UPDATE recruitment_skill s
+               SET catalog_id = a.catalog_id
+              FROM wiz_recruitment_talentpool_skill_alias a
+             WHERE a.id IN %s
+               AND lower(trim(regexp_replace(s.name, '\\s+', ' ', 'g'))) = a.key
+               AND s.catalog_id IS DISTINCT FROM a.catalog_id
+         RETURNING s.talent_id
+        """, (tuple(self.ids),))
+        talent_ids = {talent_id for talent_id, in self.env.cr.fetchall() if talent_id}
+        self.env['recruitment.skill'].invalidate_model(['catalog_id'])
+        if talent_ids:
+            self.env['wiz.recruitment.talentpool.talent'].browse(talent_ids)._profile_changed()
+
+
+class TalentSkill(models.Model):
+    _inherit = 'recruitment.skill'
+
+    catalog_id = fields.Many2one('wiz.recruitment.talentpool.skill.catalog', string="Catalogusskill",
+                                 index=True, ondelete='set null')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        Catalog = self.env['wiz.recruitment.talentpool.skill.catalog']
+        catalog_ids = Catalog._resolve([vals['name'] for vals in vals_list if vals.get('name') and not vals.get('catalog_id')])
+        for vals in vals_list:
+            if vals.get('name') and not vals.get('catalog_id'):
+                vals['catalog_id'] = catalog_ids.get(normalize_skill(vals['name']), False)
+        return super().create(vals_list)
+
+    def write(self, vals):
+        if 'name' in vals and 'catalog_id' not in vals:
+            catalog_ids = self.env['wiz.recruitment.talentpool.skill.catalog']._resolve([vals['name'] or ''])
+            vals = dict(vals, catalog_id=catalog_ids.get(normalize_skill(vals['name']), False))
+        return super().write(vals)
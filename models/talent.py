@@ -1,9 +1,114 @@
-from odoo import models, fields, api
-from odoo.exceptions import UserError
+import logging
+import re
+import secrets
+import threading
+from collections import defaultdict
 from datetime import timedelta, date
+from urllib.parse import unquote
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import AccessError, UserError
+from odoo.osv import expression
+
+from .instrumentation import instrumented
+
+_logger = logging.getLogger(__name__)
+
+INACTIVE_AFTER = timedelta(days=365)
+INACTIVE_BATCH_SIZE = 1000
+PURGE_BATCH_SIZE = 200
+PORTAL_PROVISION_BATCH_SIZE = 500
+# Uitnodigingen per cronrun en wachttijd tussen twee runs (doorvoer beperken)
+PORTAL_MAIL_BATCH_SIZE = 200
+PORTAL_MAIL_INTERVAL = timedelta(minutes=5)
+# Technische velden: een wijziging hieraan verandert niets aan het profiel zelf
+TECHNICAL_FIELDS = {'portal_mail_pending', 'match_features_dirty'}
+
+# Velden die een portaalgebruiker per profielregel mag bewerken
+PORTAL_PROFILE_FIELDS = {
+    'education_ids': ['name', 'institute', 'start_date', 'end_date'],
+    'experience_ids': ['name', 'company', 'start_date', 'end_date', 'description'],
+    'skill_ids': ['name', 'level'],
+}
+
+LINKEDIN_SLUG_RE = re.compile(r'linkedin\.com/(?:in|pub)/([^/?#]+)', re.IGNORECASE)
+
+
+def normalize_email(email):
+    """ Dedup-sleutel voor een e-mailadres: zonder spaties en in kleine letters. """
+    if not email:
+        return False
+    return email.strip().lower() or False
+
+
+def normalize_linkedin(url):
+    """ Dedup-sleutel voor een LinkedIn-profiel: de profielslug in kleine letters.
+
+    Enkel een echte profiel-URL (``/in/`` of ``/pub/``) levert een sleutel op;
+    bedrijfspagina's en vrije tekst zoals "n.v.t." zijn geen dedup-sleutel.
+    """
+    if not url:
+        return False
+    match = LINKEDIN_SLUG_RE.search(url)
+    if not match:
+        return False
+    return unquote(match.group(1)).strip().lower() or False
+
+
+class TalentProfileMixin(models.AbstractModel):
+    _name = 'recruitment.talent.profile.mixin'
+    _description = 'Profielregel van een talent'
+
+    # Elke wijziging aan opleidingen, ervaringen of skills meldt zich bij het talent.
+    # Met de context-sleutel talentpool_defer_profile_changed meldt de aanroeper dit zelf.
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._notify_profile_changed(records.talent_id)
+        return records
+
+    def write(self, vals):
+        talents = self.talent_id
+        res = super().write(vals)
+        self._notify_profile_changed(talents | self.talent_id)
+        return res
+
+    def unlink(self):
+        talents = self.talent_id
+        res = super().unlink()
+        self._notify_profile_changed(talents.exists())
+        return res
+
+    def _notify_profile_changed(self, talents):
+        if not self.env.context.get('talentpool_defer_profile_changed'):
+            talents._profile_changed()
+
+    @api.model
+    def _portal_clean_vals(self, vals, allowed):
+        """ Enkel toegelaten velden, lege waarden als False en datums als date. """
+        clean = {}
+        for fname in allowed:
+            if fname not in vals:
+                continue
+            value = vals[fname] or False
+            field = self._fields[fname]
+            if field.type == 'date':
+                try:
+                    value = fields.Date.to_date(value) or False
+                except ValueError:
+                    value = False
+            elif field.type == 'selection' and value not in field.get_values(self.env):
+                value = False
+            clean[fname] = value
+        return clean
 
 class TalentEducation(models.Model):
     _name = 'recruitment.education'
+    _inherit = ['recruitment.talent.profile.mixin']
     _description = 'Opleiding'
 
     name = fields.Char("Opleiding")
@@ -15,6 +120,7 @@ class TalentEducation(models.Model):
 
 class TalentExperience(models.Model):
     _name = 'recruitment.experience'
+    _inherit = ['recruitment.talent.profile.mixin']
     _description = 'Werkervaring'
 
     name = fields.Char("Functie")
@@ -27,9 +133,10 @@ class TalentExperience(models.Model):
 
 class TalentSkill(models.Model):
     _name = 'recruitment.skill'
+    _inherit = ['recruitment.talent.profile.mixin']
     _description = 'Skill'
 
-    name = fields.Char("Skill")
+    name = fields.Char("Skill", index='trigram')
     level = fields.Selection([('beginner', 'Beginner'), ('intermediate', 'Gemiddeld'), ('expert', 'Expert')])
     talent_id = fields.Many2one('wiz.recruitment.talentpool.talent')
     applicant_id = fields.Many2one('hr.applicant')
@@ -43,8 +150,11 @@ class Talent(models.Model):
     email = fields.Char(required=True)
     phone = fields.Char(string="Telefoonnummer")
     linkedin_profile = fields.Char(string="LinkedIn-profiel")
+    email_key = fields.Char(compute='_compute_dedup_keys', store=True, index=True)
+    linkedin_key = fields.Char(compute='_compute_dedup_keys', store=True, index=True)
     cv_attachment_id = fields.Many2one('ir.attachment', string="CV-bestand")
-    creation_date = fields.Date(default=lambda self: date.today())
+    cv_text = fields.Text("CV-tekst", readonly=True)
+    creation_date = fields.Date(default=lambda self: date.today(), index=True)
     last_update_date = fields.Date()
 
     # Profielinhoud
@@ -70,24 +180,266 @@ class Talent(models.Model):
     marked_by_user = fields.Many2one('res.users', string="Gemarkeerd door")
 
     # Portaalgebruiker
-    portal_user_id = fields.Many2one('res.users', string="Portaalgebruiker")
+    portal_user_id = fields.Many2one('res.users', string="Portaalgebruiker", index=True)
+    # Verhoogd bij elke zichtbare wijziging; sleutel van de portaalcache (ETag)
+    portal_version = fields.Integer("Portaalversie", default=1, readonly=True, copy=False)
+    portal_mail_pending = fields.Selection([
+        ('invite', "Uitnodiging"),
+        ('reset', "Wachtwoordreset"),
+    ], string="Te versturen portaalmail", readonly=True, index=True)
 
     # Historiek
     application_history_ids = fields.One2many(
         'hr.applicant', 'talent_id', string="Sollicitatiehistoriek"
     )
+    # Opgeslagen tellers, bijgewerkt vanuit hr.applicant (zie _refresh_application_stats)
+    application_count = fields.Integer("Sollicitaties", readonly=True, index=True)
+    active_application_count = fields.Integer("Lopende sollicitaties", readonly=True)
+    last_application_date = fields.Datetime("Laatste sollicitatie", readonly=True, index=True)
+
+    _sql_constraints = [
+        ('email_key_unique', 'unique(email_key)', "Er bestaat al een talent met dit e-mailadres."),
+        ('linkedin_key_unique', 'unique(linkedin_key)', "Er bestaat al een talent met dit LinkedIn-profiel."),
+    ]
 
     # Tagging
-    inactive_tag = fields.Boolean(string="1 jaar geen wijziging", compute="_compute_inactive_tag")
+    inactive_tag = fields.Boolean(
+        string="1 jaar geen wijziging", compute="_compute_inactive_tag", store=True, index=True
+    )
 
     @api.depends('last_update_date')
     def _compute_inactive_tag(self):
         for record in self:
             if record.last_update_date:
-                record.inactive_tag = (date.today() - record.last_update_date) > timedelta(days=365)
+                record.inactive_tag = (date.today() - record.last_update_date) > INACTIVE_AFTER
             else:
                 record.inactive_tag = False
 
+    @api.model
+    def _cron_refresh_inactive_tag(self, batch_size=INACTIVE_BATCH_SIZE):
+        # Enkel de talenten die de drempel van 365 dagen overschreden, bijwerken
+        threshold = date.today() - INACTIVE_AFTER
+        to_flag = self.search([
+            ('inactive_tag', '=', False),
+            ('last_update_date', '<', threshold),
+        ])
+        to_unflag = self.search([
+            ('inactive_tag', '=', True),
+            '|', ('last_update_date', '=', False), ('last_update_date', '>=', threshold),
+        ])
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        for talents, value in ((to_flag, True), (to_unflag, False)):
+            for batch in tools.split_every(batch_size, talents.ids, self.browse):
+                batch.write({'inactive_tag': value})
+                if auto_commit:
+                    self.env.cr.commit()
+
+    @api.depends('email', 'linkedin_profile')
+    def _compute_dedup_keys(self):
+        for record in self:
+            record.email_key = normalize_email(record.email)
+            record.linkedin_key = normalize_linkedin(record.linkedin_profile)
+
+    @api.model
+    def _search_by_dedup_keys(self, emails=(), linkedin_profiles=(), limit=None):
+        """ Zoek talenten op genormaliseerd e-mailadres en/of LinkedIn-profiel. """
+        email_keys = list({normalize_email(email) for email in emails} - {False})
+        linkedin_keys = list({normalize_linkedin(url) for url in linkedin_profiles} - {False})
+        domains = []
+        if email_keys:
+            domains.append([('email_key', 'in', email_keys)])
+        if linkedin_keys:
+            domains.append([('linkedin_key', 'in', linkedin_keys)])
+        if not domains:
+            return self.browse()
+        return self.search(expression.OR(domains), limit=limit)
+
+    def write(self, vals):
+        res = super().write(vals)
+        if not TECHNICAL_FIELDS.issuperset(vals):
+            self._bump_portal_version()
+        return res
+
+    def _refresh_application_stats(self):
+        """ Sollicitatietellers van deze talenten in één query herberekenen. """
+        if not self.ids:
+            return
+        self.env['hr.applicant'].flush_model(['talent_id', 'active'])
+        self.env.cr.execute("""
+            UPDATE wiz_recruitment_talentpool_talent t
+               SET application_count = s.total,
+                   active_application_count = s.active,
+                   last_application_date = s.last
+              FROM (SELECT ids.id,
+                           count(a.id) AS total,
+                           count(a.id) FILTER (WHERE a.active) AS active,
+                           max(a.create_date) AS last
+                      FROM unnest(%s) AS ids(id)
+                 LEFT JOIN hr_applicant a ON a.talent_id = ids.id
+                  GROUP BY ids.id) s
+             WHERE t.id = s.id
+        """, [list(self.ids)])
+        self.invalidate_recordset(['application_count', 'active_application_count', 'last_application_date'])
+        # De sollicitaties staan ook op /my/talent
+        self._bump_portal_version()
+
+    def _profile_changed(self):
+        """ Hook: opleidingen, ervaringen of skills van deze talenten zijn gewijzigd. """
+        self._bump_portal_version()
+        return True
+
+    #-------------------------------------------------------------------------
+    # Portaal
+    #-------------------------------------------------------------------------
+
+    def _bump_portal_version(self):
+        """ Nieuwe portaalversie: gecachte portaalpagina's van deze talenten vervallen. """
+        if not self.ids:
+            return
+        self.env.cr.execute("""
+            UPDATE wiz_recruitment_talentpool_talent
+               SET portal_version = COALESCE(portal_version, 0) + 1
+             WHERE id IN %s
+        """, [tuple(self.ids)])
+        self.invalidate_recordset(['portal_version'])
+
+    @api.model
+    def _get_portal_talent(self, user=None):
+        """ Talentprofiel (sudo) van de portaalgebruiker.
+
+        Eén geïndexeerde query op portal_user_id per request; zo hoeft een
+        koppeling nooit de ormcache van alle workers leeg te maken.
+        """
+        user = user or self.env.user
+        return user.sudo().talentpool_talent_ids[:1]
+
+    def _portal_apply_profile_changes(self, changes):
+        """ Pas bewerkingen uit de portaal toe op de profielregels van dit talent.
+
+        ``changes`` heeft per One2many-veld uit PORTAL_PROFILE_FIELDS de vorm
+        ``{'create': [vals], 'update': {id: vals}, 'delete': [ids]}``. Het
+        eigenaarschap van alle ids wordt per model in één query gecontroleerd;
+        daarna volgt per model één create, één unlink en enkel writes voor
+        regels die echt gewijzigd zijn (gegroepeerd per identieke waarden).
+        """
+        self.ensure_one()
+        counts = defaultdict(int)
+        for fname, allowed in PORTAL_PROFILE_FIELDS.items():
+            change = changes.get(fname) or {}
+            Model = self.env[self._fields[fname].comodel_name].with_context(talentpool_defer_profile_changed=True)
+            updates = {
+                int(record_id): Model._portal_clean_vals(vals, allowed)
+                for record_id, vals in (change.get('update') or {}).items()
+            }
+            delete_ids = {int(record_id) for record_id in change.get('delete') or []}
+            record_ids = set(updates) | delete_ids
+            owned = Model.search([('id', 'in', list(record_ids)), ('talent_id', '=', self.id)]) if record_ids else Model
+            if len(owned) != len(record_ids):
+                raise AccessError("Je kan enkel je eigen profielgegevens bewerken.")
+
+            Model.browse(delete_ids).unlink()
+            current = {
+                record['id']: record
+                for record in owned.filtered(lambda r: r.id not in delete_ids).read(allowed)
+            }
+            ids_by_vals = defaultdict(list)
+            for record_id, vals in updates.items():
+                if record_id in current and any(current[record_id][key] != value for key, value in vals.items()):
+                    ids_by_vals[tuple(sorted(vals.items()))].append(record_id)
+            for vals, record_ids in ids_by_vals.items():
+                Model.browse(record_ids).write(dict(vals))
+            # Nieuwe regels zonder naam (het lege formulierblok) overslaan
+            created = Model.create([
+                dict(Model._portal_clean_vals(vals, allowed), talent_id=self.id)
+                for vals in change.get('create') or []
+                if vals.get('name')
+            ])
+            counts[fname] = len(created) + sum(len(ids) for ids in ids_by_vals.values()) + len(delete_ids)
+        self._profile_changed()
+        return dict(counts)
+
+    #-------------------------------------------------------------------------
+    # AVG-verwijdering
+    #-------------------------------------------------------------------------
+
+    def _get_purge_counts(self):
+        """ Aantallen die een verwijdering van deze talenten zou opruimen. """
+        return {
+            'talents': len(self),
+            'educations': self.env['recruitment.education'].search_count([('talent_id', 'in', self.ids)]),
+            'experiences': self.env['recruitment.experience'].search_count([('talent_id', 'in', self.ids)]),
+            'skills': self.env['recruitment.skill'].search_count([('talent_id', 'in', self.ids)]),
+            'attachments': len(self._get_purge_attachments()),
+            'portal_users': len(self.portal_user_id.filtered('share')),
+        }
+
+    def _get_purge_attachments(self):
+        return self.env['ir.attachment'].search([
+            ('res_model', '=', self._name),
+            ('res_id', 'in', self.ids),
+        ]) | self.cv_attachment_id
+
+    def _purge(self):
+        """ Verwijder deze talenten met profiel, bijlagen en portaalgebruikers. """
+        counts = self._get_purge_counts()
+        # Enkel portaalgebruikers; een gekoppelde interne gebruiker verliest alleen de koppeling
+        users = self.portal_user_id.filtered('share')
+        partners = users.partner_id
+        for model in ('recruitment.education', 'recruitment.experience', 'recruitment.skill'):
+            self.env[model].search([('talent_id', 'in', self.ids)]).unlink()
+        # De bestanden zelf verdwijnen bij de volgende garbage collection van de filestore
+        self._get_purge_attachments().unlink()
+        self.unlink()
+        # Per gebruiker en partner apart, zodat één blijvende referentie de rest niet tegenhoudt
+        for user in users:
+            try:
+                with self.env.cr.savepoint():
+                    user.unlink()
+            except psycopg2.IntegrityError:
+                # Nog elders gerefereerd: persoonsgegevens wissen en archiveren
+                _logger.warning("Portaalgebruiker %s kon niet verwijderd worden; geanonimiseerd.", user.id)
+                user.write({'login': f'avg-verwijderd-{secrets.token_hex(8)}', 'active': False})
+        # Partners van achtergebleven gebruikers worden sowieso geanonimiseerd
+        anonymize = partners.with_context(active_test=False).filtered('user_ids')
+        for partner in partners - anonymize:
+            try:
+                with self.env.cr.savepoint():
+                    partner.unlink()
+            except psycopg2.IntegrityError:
+                anonymize |= partner
+        anonymize.write({
+            'name': "Verwijderd talent",
+            'email': False,
+            'phone': False,
+            'mobile': False,
+            'active': False,
+        })
+        return counts
+
+    def _purge_in_batches(self, batch_size=PURGE_BATCH_SIZE, dry_run=False):
+        """ Verwijder de gemarkeerde talenten uit self in blokken, met een commit per blok.
+
+        Verwijderde talenten verdwijnen uit de selectie, dus een onderbroken
+        run gaat bij een volgende aanroep gewoon verder met de rest.
+        """
+        talents = self.sudo().filtered('marked_for_deletion')
+        if dry_run:
+            return talents._get_purge_counts()
+        counts = defaultdict(int)
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        for batch in tools.split_every(batch_size, talents.ids, talents.browse):
+            for key, value in batch._purge().items():
+                counts[key] += value
+            if auto_commit:
+                self.env.cr.commit()
+            _logger.info("AVG-verwijdering: %s talenten verwijderd", counts['talents'])
+        return dict(counts)
+
+    @api.model
+    def _cron_purge_marked_talents(self, batch_size=PURGE_BATCH_SIZE, limit=None):
+        talents = self.sudo().search([('marked_for_deletion', '=', True)], order='id', limit=limit)
+        return talents._purge_in_batches(batch_size=batch_size)
+
     # def action_reapply(self):
     #    for record in self:
     #        self.env['hr.applicant'].create({
@@ -104,45 +456,150 @@ class Talent(models.Model):
     #-------------------------------------------------------------------------
 
 
+    @instrumented
     def action_reapply(self):
-        for talent in self:
-            applicant = self.env['hr.applicant'].create({
-                'name': talent.name,
-                'partner_id': talent.portal_user_id.partner_id.id,
-                'talent_id': talent.id,
-            })
-            applicant.copy_talent_data_to_applicant(talent)
+        applicants = self.env['hr.applicant'].create([{
+            'name': talent.name,
+            'partner_id': talent.portal_user_id.partner_id.id,
+            'talent_id': talent.id,
+        } for talent in self])
+        applicants.copy_talents_data_to_applicants(self)
+        if len(applicants) == 1:
             return {
                 'type': 'ir.actions.act_window',
                 'res_model': 'hr.applicant',
                 'view_mode': 'form',
-                'res_id': applicant.id,
+                'res_id': applicants.id,
                 'target': 'current',
             }
-    
+        return {
+            'type': 'ir.actions.act_window',
+            'name': "Herplaatste sollicitaties",
+            'res_model': 'hr.applicant',
+            'view_mode': 'tree,form',
+            'domain': [('id', 'in', applicants.ids)],
+            'target': 'current',
+        }
+
     def action_create_portal_user(self):
-        for record in self:
-            if record.portal_user_id:
-                raise UserError("Portaalgebruiker bestaat al.")
-            partner = self.env['res.partner'].create({
-                'name': record.name,
-                'email': record.email,
-                'phone': record.phone,
-            })
-            user = self.env['res.users'].create({
-                'name': record.name,
-                'login': record.email,
-                'email': record.email,
-                'partner_id': partner.id,
+        return self.action_provision_portal_users()
+
+    def action_provision_portal_users(self):
+        """ Portaalgebruikers aanmaken of koppelen voor de hele selectie; de
+        uitnodigingen gaan gespreid via de cron en de mailwachtrij.
+        """
+        counts = defaultdict(int)
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        for batch in tools.split_every(PORTAL_PROVISION_BATCH_SIZE, self.ids, self.browse):
+            for key, value in batch._provision_portal_users_batch().items():
+                counts[key] += value
+            if auto_commit:
+                self.env.cr.commit()
+        if counts['invited']:
+            self.env.ref('wiz_recruitment_talentpool.ir_cron_send_portal_mails')._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': "Portaalgebruikers",
+                'message': (
+                    f"{counts['created']} aangemaakt, {counts['linked']} gekoppeld aan een bestaande gebruiker, "
+                    f"{counts['skipped']} overgeslagen. {counts['invited']} uitnodigingen in de wachtrij."
+                ),
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+    def _provision_portal_users_batch(self):
+        Users = self.env['res.users'].sudo().with_context(active_test=False)
+        Partner = self.env['res.partner'].sudo()
+        # Zelfde normalisatie als res.partner.email_normalized ("Jan <jan@x.nl>" -> jan@x.nl);
+        # talenten zonder geldig e-mailadres worden overgeslagen
+        email_by_talent = {
+            talent: tools.email_normalize(talent.email)
+            for talent in self if not talent.portal_user_id and talent.email
+        }
+        todo = self.browse([talent.id for talent, email in email_by_talent.items() if email])
+        counts = {'created': 0, 'linked': 0, 'skipped': len(self) - len(todo), 'invited': 0}
+        if not todo:
+            return counts
+        emails = list({email_by_talent[talent] for talent in todo})
+
+        # Bestaande gebruikers en partners voor alle e-mailadressen in één query per model
+        users_by_email = {}
+        for user in Users.search([('login', 'in', emails + todo.mapped('email'))], order='id'):
+            users_by_email.setdefault(tools.email_normalize(user.login) or user.login, user)
+        partners_by_email = {}
+        for partner in Partner.search([('email_normalized', 'in', emails), ('user_ids', '=', False)], order='id'):
+            partners_by_email.setdefault(partner.email_normalized, partner)
+
+        new_talents = todo.filtered(lambda t: email_by_talent[t] not in users_by_email)
+        new_partners = Partner.create([{
+            'name': talent.name,
+            'email': talent.email,
+            'phone': talent.phone,
+        } for talent in new_talents if email_by_talent[talent] not in partners_by_email])
+        partners_by_email.update({partner.email_normalized: partner for partner in new_partners})
+        # Dezelfde e-mail kan twee keer in de selectie zitten: één gebruiker per adres
+        user_vals = {}
+        for talent in new_talents:
+            email = email_by_talent[talent]
+            user_vals.setdefault(email, {
+                'name': talent.name,
+                'login': email,
+                'email': email,
+                'partner_id': partners_by_email[email].id,
                 'groups_id': [(6, 0, [self.env.ref('base.group_portal').id])],
             })
-            record.portal_user_id = user.id
+        new_users = Users.with_context(no_reset_password=True).create(list(user_vals.values()))
+        users_by_email.update(zip(user_vals, new_users))
+
+        values = []
+        for talent in todo:
+            user = users_by_email[email_by_talent[talent]]
+            if not user.active or not user.share:
+                # Gearchiveerde gebruikers niet stilzwijgend heractiveren en
+                # nooit een interne gebruiker aan een talent koppelen
+                counts['skipped'] += 1
+                continue
+            # Nieuwe gebruikers en gebruikers die nooit inlogden krijgen een uitnodiging
+            invite = user in new_users or not user.login_date
+            values.append((talent.id, user.id, 'invite' if invite else None))
+            counts['invited'] += invite
+            counts['created' if user in new_users else 'linked'] += 1
+        if values:
+            self.flush_model(['portal_user_id', 'portal_mail_pending'])
+            execute_values(self.env.cr._obj, """
+                UPDATE wiz_recruitment_talentpool_talent t
+                   SET portal_user_id = v.user_id, portal_mail_pending = v.pending
+                  FROM (VALUES %s) AS v(id, user_id, pending)
+                 WHERE t.id = v.id
+            """, values)
+            todo.invalidate_recordset(['portal_user_id', 'portal_mail_pending'])
+            self.env['res.users'].invalidate_model(['talentpool_talent_ids'])
+            self.env['wiz.recruitment.talentpool.change']._record(
+                self._name, 'write', [(talent_id, talent_id) for talent_id, _user_id, _pending in values])
+        return counts
 
     def action_reset_portal_user(self):
-        for record in self:
-            if not record.portal_user_id:
-                raise UserError("Geen gekoppelde portaalgebruiker.")
-            record.portal_user_id.action_reset_password()
+        talents = self.filtered('portal_user_id')
+        if not talents:
+            raise UserError("Geen gekoppelde portaalgebruiker.")
+        talents.write({'portal_mail_pending': 'reset'})
+        self.env.ref('wiz_recruitment_talentpool.ir_cron_send_portal_mails')._trigger()
+
+    @api.model
+    def _cron_send_portal_mails(self, batch_size=PORTAL_MAIL_BATCH_SIZE):
+        """ Zet een beperkt aantal uitnodigingen en resets in de mailwachtrij. """
+        talents = self.search([('portal_mail_pending', '!=', False)], order='id', limit=batch_size)
+        for kind in ('invite', 'reset'):
+            batch = talents.filtered(lambda t: t.portal_mail_pending == kind)
+            batch.portal_user_id._talentpool_queue_signup_mail(invite=kind == 'invite')
+        talents.write({'portal_mail_pending': False})
+        if len(talents) == batch_size:
+            self.env.ref('wiz_recruitment_talentpool.ir_cron_send_portal_mails')._trigger(
+                fields.Datetime.now() + PORTAL_MAIL_INTERVAL)
 
     def action_open_linkedin(self):
         for record in self:
@@ -153,3 +610,25 @@ class Talent(models.Model):
                 'url': record.linkedin_profile,
                 'target': 'new',
             }
+
+    def action_purge_marked(self):
+        return self._notify_purge(self._purge_in_batches(), "Gemarkeerde talenten verwijderd")
+
+    def action_purge_marked_dry_run(self):
+        return self._notify_purge(self._purge_in_batches(dry_run=True), "Proefrun verwijdering")
+
+    def _notify_purge(self, counts, title):
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': title,
+                'message': (
+                    f"{counts.get('talents', 0)} talenten, {counts.get('educations', 0)} opleidingen, "
+                    f"{counts.get('experiences', 0)} ervaringen, {counts.get('skills', 0)} skills, "
+                    f"{counts.get('attachments', 0)} bijlagen en {counts.get('portal_users', 0)} portaalgebruikers."
+                ),
+                'type': 'info',
+                'sticky': True,
+            }
+        }
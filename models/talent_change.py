@@ -0,0 +1,267 @@
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api
+from odoo.tools.sql import column_exists, create_column
+
+from .talent import TECHNICAL_FIELDS
+from .talent_export import EXPORT_APPLICATION_FIELDS
+
+TALENT_MODEL = 'wiz.recruitment.talentpool.talent'
+# Sollicitatievelden die in het feeddocument van het talent staan
+FEED_APPLICATION_FIELDS = {'talent_id'} | set(EXPORT_APPLICATION_FIELDS)
+FEED_PAGE_SIZE = 500
+FEED_MAX_PAGE_SIZE = 5000
+FEED_RETENTION_DAYS = 90
+# Hoogste cursor die al opgeruimd werd; oudere cursors moeten volledig opnieuw synchroniseren
+FEED_PURGED_PARAM = 'wiz_recruitment_talentpool.change_feed_purged_until'
+
+
+def parse_cursor(cursor):
+    """ Cursor ``"<txid>-<id>"`` als tuple; leeg of 0 is het begin van de feed.
+
+    Een oude cursor met enkel een volgnummer begint opnieuw vooraan in de
+    transactievolgorde: de client krijgt hoogstens talenten dubbel.
+    """
+    if not cursor:
+        return (0, 0)
+    txid, _sep, change_id = str(cursor).rpartition('-')
+    return (int(txid or 0), int(change_id))
+
+
+def format_cursor(position):
+    return '%s-%s' % position
+
+
+class TalentChange(models.Model):
+    """ Wijzigingslog van talenten, profielregels en bijlagen voor externe synchronisatie.
+
+    Elke rij bewaart de transactie (txid) die ze schreef. De feed loopt op
+    (txid, id) en geeft enkel rijen vrij van transacties ouder dan de oudste
+    nog lopende transactie: elke rij die later zichtbaar wordt, komt dan na
+    de cursor, ook als een oudere transactie pas na een jongere commit.
+    """
+    _name = 'wiz.recruitment.talentpool.change'
+    _description = 'Talentwijziging'
+    _log_access = False
+    _order = 'id'
+
+    model = fields.Char("Model", required=True)
+    res_id = fields.Integer("Record", required=True)
+    # Geen Many2one: de rij blijft bestaan nadat het talent verwijderd is
+    talent_id = fields.Integer("Talent", required=True, index=True)
+    operation = fields.Selection([
+        ('create', "Aangemaakt"),
+        ('write', "Gewijzigd"),
+        ('unlink', "Verwijderd"),
+    ], string="Bewerking", required=True)
+    change_date = fields.Datetime("Tijdstip", required=True, index=True)
+
+    def init(self):
+        if not column_exists(self.env.cr, self._table, 'txid'):
+            create_column(self.env.cr, self._table, 'txid', 'bigint')
+        self.env.cr.execute(f"""
+            CREATE INDEX IF NOT EXISTS {self._table}_txid_id_idx ON {self._table} (txid, id)
+        """)
+
+    def _released_sql(self):
+        """ SQL-voorwaarde: de wijziging is gecommit en er loopt geen oudere transactie meer. """
+        return "c.txid < txid_snapshot_xmin(txid_current_snapshot())"
+
+    @api.model
+    def _record(self, model, operation, rows):
+        """ Log (res_id, talent_id)-paren van ``model`` in één INSERT. """
+        rows = {(res_id, talent_id) for res_id, talent_id in rows if talent_id}
+        if not rows:
+            return
+        execute_values(self.env.cr._obj, f"""
+            INSERT INTO {self._table} (model, res_id, talent_id, operation, change_date, txid)
+            VALUES %s
+        """, [(model, res_id, talent_id, operation) for res_id, talent_id in sorted(rows)],
+            template="(%s, %s, %s, %s, now() AT TIME ZONE 'UTC', txid_current())")
+
+    @api.model
+    def get_changes(self, cursor=0, limit=FEED_PAGE_SIZE):
+        """ Gewijzigde talenten na ``cursor`` (zoals teruggegeven door de vorige pagina).
+
+        Geeft ``upserts`` (volledige talenten, zoals in de export, met hun
+        bijlagen), ``deletes`` (ids van verwijderde talenten), de nieuwe
+        ``cursor`` en ``has_more`` terug. ``reset`` betekent dat de cursor
+        ouder is dan de bewaartermijn en een volledige synchronisatie nodig is.
+
+        Een pagina stopt bij de eerste wijziging van een transactie die nog
+        loopt of jonger is dan de oudste lopende transactie (de xmin van de
+        snapshot). Een langlopende transactie in de database, ook een die de
+        talenten niet raakt, houdt de feed dus tegen tot ze afgelopen is.
+        """
+        Talent = self.env[TALENT_MODEL]
+        Talent.check_access_rights('read')
+        position = parse_cursor(cursor)
+        limit = min(max(int(limit or FEED_PAGE_SIZE), 1), FEED_MAX_PAGE_SIZE)
+        purged_until = parse_cursor(self.env['ir.config_parameter'].sudo().get_param(FEED_PURGED_PARAM))
+        cr = self.env.cr
+        cr.execute(f"""
+            SELECT c.txid, c.id, c.talent_id, {self._released_sql()}
+              FROM {self._table} c
+             WHERE (c.txid, c.id) > (%s, %s)
+          ORDER BY c.txid, c.id
+             LIMIT %s
+        """, (*position, limit))
+        rows = cr.fetchall()
+        next_position, talent_ids, held_back = position, set(), False
+        for txid, change_id, talent_id, released in rows:
+            # Stoppen aan de eerste rij van een transactie die (of waarvoor een oudere) nog loopt
+            if not released:
+                held_back = True
+                break
+            next_position = (txid, change_id)
+            talent_ids.add(talent_id)
+
+        existing = Talent.sudo().browse(talent_ids).exists()
+        visible = Talent.search([('id', 'in', existing.ids)], order='id')
+        attachments = {talent_id: [] for talent_id in visible.ids}
+        for attachment in self.env['ir.attachment'].search_read(
+                [('res_model', '=', TALENT_MODEL), ('res_id', 'in', visible.ids), ('res_field', '=', False)],
+                ['res_id', 'name', 'mimetype', 'checksum', 'file_size'], order='res_id, id'):
+            attachments[attachment.pop('res_id')].append(attachment)
+        upserts = [
+            dict(row, attachments=attachments[row['id']])
+            for row in Talent._export_iter_rows([('id', 'in', visible.ids)])
+        ] if visible else []
+        return {
+            'cursor': format_cursor(next_position),
+            'has_more': len(rows) == limit or held_back,
+            'reset': position < purged_until,
+            'upserts': upserts,
+            'deletes': sorted(talent_ids - set(existing.ids)),
+        }
+
+    @api.model
+    def get_head_cursor(self):
+        """ Cursor na de laatste vrijgegeven wijziging, om vanaf nu te synchroniseren. """
+        self.env.cr.execute(f"""
+            SELECT c.txid, c.id
+              FROM {self._table} c
+             WHERE {self._released_sql()}
+          ORDER BY c.txid DESC, c.id DESC
+             LIMIT 1
+        """)
+        return format_cursor(self.env.cr.fetchone() or (0, 0))
+
+    @api.model
+    def _cron_purge(self, retention_days=FEED_RETENTION_DAYS):
+        self.env.cr.execute(f"""
+            WITH purged AS (
+                DELETE FROM {self._table}
+                 WHERE change_date < (now() AT TIME ZONE 'UTC') - make_interval(days => %s)
+             RETURNING txid, id
+            )
+            SELECT txid, id FROM purged ORDER BY txid DESC, id DESC LIMIT 1
+        """, (retention_days,))
+        purged_until = self.env.cr.fetchone()
+        if purged_until and purged_until > parse_cursor(
+                self.env['ir.config_parameter'].sudo().get_param(FEED_PURGED_PARAM)):
+            self.env['ir.config_parameter'].sudo().set_param(FEED_PURGED_PARAM, format_cursor(purged_until))
+
+
+class Talent(models.Model):
+    _inherit = TALENT_MODEL
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        talents = super().create(vals_list)
+        self.env['wiz.recruitment.talentpool.change']._record(self._name, 'create', [(t.id, t.id) for t in talents])
+        return talents
+
+    def write(self, vals):
+        res = super().write(vals)
+        if not TECHNICAL_FIELDS.issuperset(vals):
+            self.env['wiz.recruitment.talentpool.change']._record(self._name, 'write', [(t.id, t.id) for t in self])
+        return res
+
+    def unlink(self):
+        self.env['wiz.recruitment.talentpool.change']._record(self._name, 'unlink', [(t.id, t.id) for t in self])
+        return super().unlink()
+
+
+class TalentProfileMixin(models.AbstractModel):
+    _inherit = 'recruitment.talent.profile.mixin'
+
+    # Enkel regels van een talent; kopieën op sollicitanten horen niet in de feed
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._record_talent_change('create')
+        return records
+
+    def write(self, vals):
+        before = [(record.id, record.talent_id.id) for record in self]
+        res = super().write(vals)
+        self._record_talent_change('write', before)
+        return res
+
+    def unlink(self):
+        self._record_talent_change('unlink')
+        return super().unlink()
+
+    def _record_talent_change(self, operation, extra_rows=()):
+        # Bij een verplaatste regel wijzigen zowel het oude als het nieuwe talent
+        rows = [(record.id, record.talent_id.id) for record in self] + list(extra_rows)
+        self.env['wiz.recruitment.talentpool.change']._record(self._name, operation, rows)
+
+
+class Applicant(models.Model):
+    _inherit = 'hr.applicant'
+
+    # De sollicitaties staan in het feeddocument van hun talent
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        applicants = super().create(vals_list)
+        applicants._record_talent_change('create')
+        return applicants
+
+    def write(self, vals):
+        if not FEED_APPLICATION_FIELDS & vals.keys():
+            return super().write(vals)
+        before = [(applicant.id, applicant.talent_id.id) for applicant in self]
+        res = super().write(vals)
+        self._record_talent_change('write', before)
+        return res
+
+    def unlink(self):
+        self._record_talent_change('unlink')
+        return super().unlink()
+
+    def _record_talent_change(self, operation, extra_rows=()):
+        rows = [(applicant.id, applicant.talent_id.id) for applicant in self] + list(extra_rows)
+        self.env['wiz.recruitment.talentpool.change'].sudo()._record(self._name, operation, rows)
+
+
+class IrAttachment(models.Model):
+    _inherit = 'ir.attachment'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        attachments = super().create(vals_list)
+        attachments._record_talent_change('create')
+        return attachments
+
+    def write(self, vals):
+        before = self._talent_change_rows()
+        res = super().write(vals)
+        self._record_talent_change('write', before)
+        return res
+
+    def unlink(self):
+        self._record_talent_change('unlink')
+        return super().unlink()
+
+    def _talent_change_rows(self):
+        return [(attachment.id, attachment.res_id) for attachment in self.sudo()
+                if attachment.res_model == TALENT_MODEL and not attachment.res_field]
+
+    def _record_talent_change(self, operation, extra_rows=()):
+        rows = self._talent_change_rows() + list(extra_rows)
+        if rows:
+            self.env['wiz.recruitment.talentpool.change'].sudo()._record(self._name, operation, rows)
@@ -0,0 +1,290 @@
+import logging
+import threading
+
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Groepen per blok (en commit) bij het samenvoegen
+MERGE_BATCH_SIZE = 1000
+# Telefoonnummers vergelijken op de laatste cijfers, zodat +31 6... en 06... samenvallen
+PHONE_MATCH_DIGITS = 9
+
+# Kandidaat-dubbels per genormaliseerde sleutel, in één GROUP BY
+DUPLICATE_KEYS_SQL = f"""
+    SELECT kind, array_agg(id ORDER BY id)
+      FROM (
+            SELECT id, 'email' AS kind, lower(trim(email)) AS key
+              FROM wiz_recruitment_talentpool_talent
+             WHERE trim(COALESCE(email, '')) != ''
+         UNION ALL
+            SELECT id, 'phone', right(regexp_replace(phone, '\\D', '', 'g'), {PHONE_MATCH_DIGITS})
+              FROM wiz_recruitment_talentpool_talent
+             WHERE length(regexp_replace(COALESCE(phone, ''), '\\D', '', 'g')) >= {PHONE_MATCH_DIGITS}
+         UNION ALL
+            SELECT id, 'linkedin', COALESCE(linkedin_key, lower(substring(linkedin_profile FROM 'linkedin\\.com/(?:in|pub)/([^/?#]+)')))
+              FROM wiz_recruitment_talentpool_talent
+             WHERE linkedin_profile IS NOT NULL
+           ) keys
+     WHERE key IS NOT NULL
+  GROUP BY kind, key
+    HAVING count(*) > 1
+"""
+
+
+class TalentDuplicateGroup(models.Model):
+    """ Groep talenten die vermoedelijk dezelfde persoon zijn. """
+    _name = 'wiz.recruitment.talentpool.duplicate'
+    _description = 'Dubbele talenten'
+    _order = 'id desc'
+
+    talent_ids = fields.Many2many('wiz.recruitment.talentpool.talent', string="Talenten")
+    survivor_id = fields.Many2one('wiz.recruitment.talentpool.talent', string="Behouden talent",
+                                  ondelete='cascade', domain="[('id', 'in', talent_ids)]")
+    reasons = fields.Char("Overeenkomst")
+    talent_count = fields.Integer("Aantal", compute='_compute_talent_count')
+    state = fields.Selection([
+        ('open', "Te beoordelen"),
+        ('merged', "Samengevoegd"),
+        ('ignored', "Genegeerd"),
+    ], default='open', required=True, index=True)
+
+    @api.depends('talent_ids')
+    def _compute_talent_count(self):
+        for group in self:
+            group.talent_count = len(group.talent_ids)
+
+    def action_ignore(self):
+        self.write({'state': 'ignored'})
+
+    @api.model
+    def action_detect(self):
+        self._detect()
+        return {'type': 'ir.actions.client', 'tag': 'reload'}
+
+    @api.model
+    def _detect(self):
+        """ Bouw de open groepen opnieuw op uit de SQL-groepering; talenten die via
+        verschillende sleutels verbonden zijn, vormen samen één groep.
+        """
+        Talent = self.env['wiz.recruitment.talentpool.talent']
+        Talent.flush_model(['email', 'phone', 'linkedin_profile', 'linkedin_key'])
+        self.env.cr.execute(DUPLICATE_KEYS_SQL)
+        parent = {}
+
+        def find(talent_id):
+            root = talent_id
+            while parent.setdefault(root, root) != root:
+                root = parent[root]
+            while parent[talent_id] != root:
+                parent[talent_id], talent_id = root, parent[talent_id]
+            return root
+
+        reasons = {}
+        for kind, talent_ids in self.env.cr.fetchall():
+            root = find(talent_ids[0])
+            for talent_id in talent_ids[1:]:
+                parent[find(talent_id)] = root
+            reasons.setdefault(tuple(talent_ids), set()).add(kind)
+
+        groups = {}
+        for talent_id in parent:
+            groups.setdefault(find(talent_id), []).append(talent_id)
+        kinds = {}
+        for talent_ids, group_kinds in reasons.items():
+            kinds.setdefault(find(talent_ids[0]), set()).update(group_kinds)
+
+        ignored = {
+            frozenset(group.talent_ids.ids) for group in self.search([('state', '=', 'ignored')])
+        }
+        self.search([('state', '=', 'open')]).unlink()
+        vals_list = []
+        for root, talent_ids in groups.items():
+            talent_ids = sorted(talent_ids)
+            if len(talent_ids) < 2 or frozenset(talent_ids) in ignored:
+                continue
+            vals_list.append({
+                'talent_ids': [(6, 0, talent_ids)],
+                'reasons': ', '.join(sorted(kinds.get(root, ()))),
+            })
+        groups = self.create(vals_list)
+        groups._set_default_survivor()
+        return groups
+
+    def _set_default_survivor(self):
+        # Voorkeur: het talent met de dedup-sleutel (het origineel), dan de meeste sollicitaties, dan het oudste
+        for group in self:
+            group.survivor_id = group.talent_ids.sorted(
+                lambda t: (not t.email_key, -t.application_count, t.id))[:1]
+
+    def action_merge(self):
+        groups = self.filtered(lambda g: g.state == 'open' and g.survivor_id)
+        mapping = groups._merge_mapping()
+        if not mapping:
+            raise UserError("Er zijn geen open groepen met een behouden talent geselecteerd.")
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        Talent = self.env['wiz.recruitment.talentpool.talent'].sudo()
+        # Per blok volledige groepen, die in dezelfde transactie als samengevoegd gemarkeerd worden
+        for chunk in tools.split_every(MERGE_BATCH_SIZE, groups.ids, groups.browse):
+            Talent._merge_talents(chunk._merge_mapping())
+            chunk.write({'state': 'merged'})
+            if auto_commit:
+                self.env.cr.commit()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': "Talenten samengevoegd",
+                'message': f"{len(mapping)} dubbele talenten samengevoegd in {len(groups)} talenten.",
+                'type': 'success',
+                'sticky': False,
+            }
+        }
+
+
+    def _merge_mapping(self):
+        return {
+            talent.id: group.survivor_id.id
+            for group in self
+            for talent in group.talent_ids - group.survivor_id
+        }
+
+
+class Talent(models.Model):
+    _inherit = 'wiz.recruitment.talentpool.talent'
+
+    @api.model
+    def _merge_talents(self, mapping):
+        """ Voeg talenten samen volgens ``{dubbel_id: behouden_id}``.
+
+        Alles wordt met bulk-UPDATEs over een tijdelijke koppeltabel verplaatst:
+        profielregels, bijlagen, sollicitaties en de portaalgebruiker. Daarna
+        worden de dubbels in één keer verwijderd.
+        """
+        if not mapping:
+            return
+        survivors = self.browse(set(mapping.values()))
+        duplicates = self.browse(list(mapping))
+        if survivors & duplicates:
+            raise UserError("Een behouden talent kan niet zelf samengevoegd worden.")
+        self.env.flush_all()
+        cr = self.env.cr
+        cr.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS talentpool_merge_map (old_id integer PRIMARY KEY, new_id integer)
+            ON COMMIT DROP
+        """)
+        cr.execute("TRUNCATE talentpool_merge_map")
+        execute_values(cr._obj, "INSERT INTO talentpool_merge_map (old_id, new_id) VALUES %s",
+                       list(mapping.items()), page_size=1000)
+
+        Change = self.env['wiz.recruitment.talentpool.change']
+        for model in ('recruitment.education', 'recruitment.experience', 'recruitment.skill', 'hr.applicant'):
+            cr.execute(f"""
+                UPDATE {self.env[model]._table} r
+                   SET talent_id = m.new_id
+                  FROM talentpool_merge_map m
+                 WHERE r.talent_id = m.old_id
+             RETURNING r.id, m.new_id
+            """)
+            Change._record(model, 'write', cr.fetchall())
+        # Dezelfde catalogusskill maar één keer per talent behouden
+        cr.execute("""
+            DELETE FROM recruitment_skill s
+             USING recruitment_skill k
+             WHERE s.talent_id = k.talent_id
+               AND s.catalog_id = k.catalog_id
+               AND s.id > k.id
+               AND s.talent_id IN %s
+        """, (tuple(survivors.ids),))
+        cr.execute("""
+            UPDATE ir_attachment a
+               SET res_id = m.new_id
+              FROM talentpool_merge_map m
+             WHERE a.res_model = %s
+               AND a.res_id = m.old_id
+         RETURNING a.id, m.new_id
+        """, (self._name,))
+        Change._record('ir.attachment', 'write', cr.fetchall())
+        # Hoogstens één cv-taak per behouden talent (unique(talent_id)); de rest vervalt
+        cr.execute("""
+            UPDATE wiz_recruitment_talentpool_cv_job j
+               SET talent_id = x.new_id
+              FROM (SELECT DISTINCT ON (m.new_id) m.new_id, d.id
+                      FROM talentpool_merge_map m
+                      JOIN wiz_recruitment_talentpool_cv_job d ON d.talent_id = m.old_id
+                     WHERE NOT EXISTS (SELECT 1 FROM wiz_recruitment_talentpool_cv_job s WHERE s.talent_id = m.new_id)
+                  ORDER BY m.new_id, d.id) x
+             WHERE j.id = x.id
+        """)
+        cr.execute("""
+            DELETE FROM wiz_recruitment_talentpool_cv_job j
+             USING talentpool_merge_map m
+             WHERE j.talent_id = m.old_id
+        """)
+        # Lege velden van het behouden talent aanvullen met de eerste dubbel die ze heeft
+        cr.execute("""
+            UPDATE wiz_recruitment_talentpool_talent t
+               SET portal_user_id = COALESCE(t.portal_user_id, d.portal_user_id),
+                   cv_attachment_id = COALESCE(t.cv_attachment_id, d.cv_attachment_id),
+                   phone = COALESCE(t.phone, d.phone)
+              FROM (SELECT DISTINCT ON (m.new_id) m.new_id, d.portal_user_id, d.cv_attachment_id, d.phone
+                      FROM talentpool_merge_map m
+                      JOIN wiz_recruitment_talentpool_talent d ON d.id = m.old_id
+                  ORDER BY m.new_id, d.portal_user_id IS NULL, d.id) d
+             WHERE t.id = d.new_id
+        """)
+        # Overige portaalgebruikers van dubbels verwijzen naar een verdwenen profiel: archiveren
+        cr.execute("""
+            SELECT d.portal_user_id
+              FROM talentpool_merge_map m
+              JOIN wiz_recruitment_talentpool_talent d ON d.id = m.old_id
+              JOIN wiz_recruitment_talentpool_talent t ON t.id = m.new_id
+             WHERE d.portal_user_id IS NOT NULL
+               AND d.portal_user_id != t.portal_user_id
+        """)
+        orphan_user_ids = [user_id for user_id, in cr.fetchall()]
+        cr.execute("""
+            UPDATE wiz_recruitment_talentpool_talent d
+               SET portal_user_id = NULL, cv_attachment_id = NULL
+              FROM talentpool_merge_map m
+             WHERE d.id = m.old_id
+        """)
+        cr.execute("TRUNCATE talentpool_merge_map")
+        self.env.invalidate_all()
+
+        self.env['res.users'].sudo().browse(orphan_user_ids).write({'active': False})
+        duplicates.unlink()
+        survivors._refresh_application_stats()
+        survivors._profile_changed()
+        Change._record(self._name, 'write', [(t.id, t.id) for t in survivors])
+        _logger.info("%s dubbele talenten samengevoegd in %s talenten", len(duplicates), len(survivors))
+
+
+class TalentMergeWizard(models.TransientModel):
+    _name = 'wiz.recruitment.talentpool.merge.wizard'
+    _description = 'Talenten samenvoegen'
+
+    group_ids = fields.Many2many('wiz.recruitment.talentpool.duplicate', string="Groepen",
+                                 default=lambda self: self._default_group_ids())
+    group_count = fields.Integer("Aantal groepen", compute='_compute_counts')
+    duplicate_count = fields.Integer("Te verwijderen talenten", compute='_compute_counts')
+
+    @api.model
+    def _default_group_ids(self):
+        if self.env.context.get('active_model') == 'wiz.recruitment.talentpool.duplicate':
+            return [(6, 0, self.env.context.get('active_ids', []))]
+        return [(6, 0, self.env['wiz.recruitment.talentpool.duplicate'].search([('state', '=', 'open')]).ids)]
+
+    @api.depends('group_ids')
+    def _compute_counts(self):
+        for wizard in self:
+            groups = wizard.group_ids.filtered(lambda g: g.state == 'open' and g.survivor_id)
+            wizard.group_count = len(groups)
+            wizard.duplicate_count = sum(len(group.talent_ids) - 1 for group in groups)
+
+    def action_merge(self):
+        self.ensure_one()
+        return self.group_ids.action_merge()
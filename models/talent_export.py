@@ -0,0 +1,231 @@
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools.safe_eval import safe_eval
+
+from .talent import PORTAL_PROFILE_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_TALENT_FIELDS = [
+    'name', 'email', 'phone', 'linkedin_profile', 'searching_for', 'not_wanted', 'notes',
+    'creation_date', 'last_update_date',
+]
+# Geneste kolommen, in hetzelfde formaat als de import (CSV/XLSX: JSON-lijst per cel)
+EXPORT_CHILD_COLUMNS = {
+    'education': 'education_ids',
+    'experience': 'experience_ids',
+    'skills': 'skill_ids',
+}
+EXPORT_APPLICATION_FIELDS = ['name', 'job_id', 'stage_id', 'create_date', 'active']
+EXPORT_COLUMNS = ['id'] + EXPORT_TALENT_FIELDS + list(EXPORT_CHILD_COLUMNS) + ['applications']
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def _json_default(value):
+    return fields.Date.to_string(value) if hasattr(value, 'isoformat') else str(value)
+
+
+def export_csv_chunks(rows):
+    """ CSV per regel, met de geneste kolommen als JSON. """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, EXPORT_COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({
+            key: json.dumps(value, default=_json_default) if isinstance(value, list) else (value or '')
+            for key, value in row.items()
+        })
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def export_jsonl_chunks(rows):
+    for row in rows:
+        yield json.dumps(row, default=_json_default) + '\n'
+
+
+class Talent(models.Model):
+    _inherit = 'wiz.recruitment.talentpool.talent'
+
+    def _export_iter_rows(self, domain=None, batch_size=EXPORT_BATCH_SIZE):
+        """ Genereer exportrijen per batch, op id geordend (keyset) zodat het
+        geheugengebruik niet meegroeit met de pool.
+        """
+        Applicant = self.env['hr.applicant'].with_context(active_test=False)
+        last_id = 0
+        while True:
+            batch = self.search(list(domain or []) + [('id', '>', last_id)], order='id', limit=batch_size)
+            if not batch:
+                return
+            last_id = batch[-1].id
+            children = {talent_id: {column: [] for column in EXPORT_CHILD_COLUMNS} for talent_id in batch.ids}
+            for column, fname in EXPORT_CHILD_COLUMNS.items():
+                Child = self.env[self._fields[fname].comodel_name]
+                for vals in Child.search_read([('talent_id', 'in', batch.ids)], PORTAL_PROFILE_FIELDS[fname] + ['talent_id'],
+                                              order='talent_id, id', load=None):
+                    talent_id = vals.pop('talent_id')
+                    vals.pop('id')
+                    children[talent_id][column].append(vals)
+            applications = {talent_id: [] for talent_id in batch.ids}
+            for vals in Applicant.search_read([('talent_id', 'in', batch.ids)], EXPORT_APPLICATION_FIELDS + ['talent_id'],
+                                              order='talent_id, create_date'):
+                talent_id = vals.pop('talent_id')[0]
+                vals.pop('id')
+                for fname in ('job_id', 'stage_id'):
+                    vals[fname] = vals[fname] and vals[fname][1]
+                applications[talent_id].append(vals)
+            for vals in batch.read(EXPORT_TALENT_FIELDS, load=None):
+                yield dict(vals, **children[vals['id']], applications=applications[vals['id']])
+            # Cache leegmaken, anders blijft elke gelezen batch in het geheugen
+            self.env.invalidate_all()
+
+
+class TalentExport(models.Model):
+    """ Export van de talentpool naar een bijlage, als achtergrondtaak. """
+    _name = 'wiz.recruitment.talentpool.export'
+    _description = 'Talentexport'
+    _order = 'id desc'
+
+    name = fields.Char("Omschrijving", required=True, default="Export")
+    file_format = fields.Selection([('csv', "CSV"), ('jsonl', "JSON Lines"), ('xlsx', "Excel")],
+                                   string="Formaat", required=True, default='csv')
+    domain = fields.Char("Filter", default='[]')
+    state = fields.Selection([
+        ('draft', "Concept"),
+        ('queued', "In wachtrij"),
+        ('done', "Klaar"),
+        ('failed', "Mislukt"),
+    ], default='draft', required=True, readonly=True)
+    talent_count = fields.Integer("Aantal talenten", readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', string="Bestand", readonly=True, ondelete='set null')
+    error = fields.Text("Fout", readonly=True)
+
+    def action_start(self):
+        self.write({'state': 'queued', 'error': False})
+        self.env.ref('wiz_recruitment_talentpool.ir_cron_run_talent_exports')._trigger()
+
+    @api.model
+    def _cron_run_exports(self):
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        for record in self.search([('state', '=', 'queued')], order='id'):
+            try:
+                record._run()
+            except Exception as e:
+                if auto_commit:
+                    self.env.cr.rollback()
+                _logger.exception("Talentexport %s mislukt", record.id)
+                record.write({'state': 'failed', 'error': str(e)})
+            if auto_commit:
+                self.env.cr.commit()
+
+    def _run(self):
+        """ Schrijf de export naar een tijdelijk bestand en bewaar het als bijlage. """
+        self.ensure_one()
+        if self.file_format == 'xlsx' and xlsxwriter is None:
+            raise UserError("Voor een Excel-export is de Python-bibliotheek xlsxwriter nodig.")
+        Talent = self.env['wiz.recruitment.talentpool.talent'].with_user(self.create_uid)
+        domain = safe_eval(self.domain or '[]')
+        count = Talent.search_count(domain)
+        rows = Talent._export_iter_rows(domain)
+        fd, path = tempfile.mkstemp(suffix='.' + self.file_format)
+        os.close(fd)
+        try:
+            self._write_file(path, rows)
+            attachment = self._attach_file(path)
+        finally:
+            if os.path.exists(path):
+                os.unlink(path)
+        self.write({
+            'state': 'done',
+            'talent_count': count,
+            'attachment_id': attachment.id,
+        })
+
+    def _attach_file(self, path):
+        """ Maak de bijlage van het exportbestand zonder het volledig in het geheugen te laden.
+
+        Bij opslag in de filestore wordt het bestand er rechtstreeks naartoe
+        verplaatst; enkel bij opslag in de database moet de inhoud ingelezen worden.
+        """
+        Attachment = self.env['ir.attachment']
+        vals = {
+            'name': f"talentpool-{fields.Date.to_string(fields.Date.context_today(self))}.{self.file_format}",
+            'mimetype': EXPORT_MIMETYPES[self.file_format],
+            'res_model': self._name,
+            'res_id': self.id,
+        }
+        if Attachment._storage() != 'file':
+            with open(path, 'rb') as f:
+                return Attachment.create(dict(vals, raw=f.read()))
+
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        checksum = sha.hexdigest()
+        store_fname = f'{checksum[:2]}/{checksum}'
+        full_path = Attachment._full_path(store_fname)
+        if not os.path.exists(full_path):
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            shutil.move(path, full_path)
+            # Zoals _file_write: bij een rollback ruimt de filestore-gc het bestand op
+            Attachment._mark_for_gc(store_fname)
+        else:
+            # Identieke inhoud staat al in de filestore
+            os.unlink(path)
+        attachment = Attachment.create(vals)
+        # store_fname, file_size en checksum zijn via de ORM niet schrijfbaar
+        self.env.cr.execute("""
+            UPDATE ir_attachment
+               SET store_fname = %s, file_size = %s, checksum = %s, db_datas = NULL
+             WHERE id = %s
+        """, [store_fname, os.path.getsize(full_path), checksum, attachment.id])
+        attachment.invalidate_recordset()
+        return attachment
+
+    def _write_file(self, path, rows):
+        if self.file_format == 'xlsx':
+            # constant_memory schrijft elke rij meteen weg naar schijf
+            workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'default_date_format': 'yyyy-mm-dd'})
+            sheet = workbook.add_worksheet("Talenten")
+            sheet.write_row(0, 0, EXPORT_COLUMNS)
+            for row_index, row in enumerate(rows, start=1):
+                sheet.write_row(row_index, 0, [
+                    json.dumps(row[column], default=_json_default) if isinstance(row[column], list) else (row[column] or '')
+                    for column in EXPORT_COLUMNS
+                ])
+            workbook.close()
+        else:
+            chunks = export_jsonl_chunks if self.file_format == 'jsonl' else export_csv_chunks
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                for chunk in chunks(rows):
+                    f.write(chunk)
+
+    def action_download(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{self.attachment_id.id}?download=true',
+            'target': 'self',
+        }
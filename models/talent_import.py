@@ -0,0 +1,211 @@
+import csv
+import io
+import itertools
+import json
+import logging
+import threading
+import time
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import UserError
+
+from .talent import PORTAL_PROFILE_FIELDS, normalize_email, normalize_linkedin
+
+_logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 1000
+# Een cronrun stopt na deze tijd; de volgende run gaat verder vanaf het checkpoint
+IMPORT_TIME_BUDGET = 600
+IMPORT_TALENT_FIELDS = [
+    'name', 'email', 'phone', 'linkedin_profile', 'searching_for', 'not_wanted', 'notes',
+    'creation_date', 'last_update_date',
+]
+# Geneste kolommen (in CSV als JSON-lijst) en hun One2many-veld op het talent
+IMPORT_CHILD_COLUMNS = {
+    'education': 'education_ids',
+    'experience': 'experience_ids',
+    'skills': 'skill_ids',
+}
+
+
+class TalentImport(models.Model):
+    """ Importeert grote CSV/JSONL-bestanden met talenten en hun profielregels.
+
+    Het bestand wordt regel per regel gelezen en in blokken verwerkt; na elk
+    blok wordt gecommit en ``lines_done`` als checkpoint bewaard. Een
+    onderbroken import gaat bij de volgende cronrun verder vanaf dat punt.
+    """
+    _name = 'wiz.recruitment.talentpool.import'
+    _description = 'Talentimport'
+    _order = 'id desc'
+
+    name = fields.Char("Omschrijving", required=True, default="Import")
+    file = fields.Binary("Bestand", attachment=True, required=True)
+    filename = fields.Char("Bestandsnaam")
+    file_format = fields.Selection([('csv', "CSV"), ('jsonl', "JSON Lines")], string="Formaat",
+                                   compute='_compute_file_format', store=True, readonly=False)
+    chunk_size = fields.Integer("Blokgrootte", default=IMPORT_CHUNK_SIZE)
+    state = fields.Selection([
+        ('draft', "Concept"),
+        ('queued', "In wachtrij"),
+        ('running', "Bezig"),
+        ('done', "Klaar"),
+        ('failed', "Mislukt"),
+    ], default='draft', required=True, readonly=True)
+    lines_done = fields.Integer("Verwerkte regels", readonly=True)
+    created_count = fields.Integer("Aangemaakt", readonly=True)
+    duplicate_count = fields.Integer("Dubbels overgeslagen", readonly=True)
+    error_count = fields.Integer("Fouten", readonly=True)
+    error_log = fields.Text("Foutenrapport", readonly=True)
+
+    @api.depends('filename')
+    def _compute_file_format(self):
+        for record in self:
+            record.file_format = 'jsonl' if (record.filename or '').lower().endswith(('.jsonl', '.json')) else 'csv'
+
+    def action_start(self):
+        self.write({'state': 'queued'})
+        self.env.ref('wiz_recruitment_talentpool.ir_cron_run_talent_imports')._trigger()
+
+    def action_reset(self):
+        self.write({
+            'state': 'draft', 'lines_done': 0, 'created_count': 0,
+            'duplicate_count': 0, 'error_count': 0, 'error_log': False,
+        })
+
+    @api.model
+    def _cron_run_imports(self, time_budget=IMPORT_TIME_BUDGET):
+        deadline = time.monotonic() + time_budget
+        for record in self.search([('state', 'in', ('queued', 'running'))], order='id'):
+            if time.monotonic() >= deadline:
+                break
+            record._run(deadline)
+
+    #-------------------------------------------------------------------------
+    # Verwerking
+    #-------------------------------------------------------------------------
+
+    def _run(self, deadline=None):
+        self.ensure_one()
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        self.state = 'running'
+        try:
+            with self._open_stream() as stream:
+                rows = itertools.islice(self._iter_rows(stream), self.lines_done, None)
+                for chunk in tools.split_every(max(self.chunk_size, 1), rows, list):
+                    self._import_chunk(chunk)
+                    if auto_commit:
+                        self.env.cr.commit()
+                    if deadline and time.monotonic() >= deadline:
+                        return
+        except Exception as e:
+            if auto_commit:
+                self.env.cr.rollback()
+            _logger.exception("Talentimport %s mislukt", self.id)
+            self.write({'state': 'failed', 'error_log': self._append_errors([f"Import gestopt: {e}"])})
+            return
+        self.state = 'done'
+
+    def _open_stream(self):
+        """ Binaire stream van het opgeladen bestand, rechtstreeks uit de filestore. """
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('res_field', '=', 'file'),
+        ], limit=1)
+        if not attachment:
+            raise UserError("Geen importbestand gevonden.")
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(attachment.raw)
+
+    def _iter_rows(self, stream):
+        """ Genereer (regelnummer, dict) per record zonder het bestand volledig te laden. """
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        if self.file_format == 'jsonl':
+            for line_no, line in enumerate(text, start=1):
+                if line.strip():
+                    yield line_no, line
+        else:
+            for line_no, row in enumerate(csv.DictReader(text), start=2):
+                yield line_no, row
+
+    def _parse_row(self, raw):
+        row = json.loads(raw) if isinstance(raw, str) else dict(raw)
+        if not isinstance(row, dict):
+            raise ValueError("record is geen object")
+        for column in IMPORT_CHILD_COLUMNS:
+            if isinstance(row.get(column), str):
+                row[column] = json.loads(row[column]) if row[column].strip() else []
+        if not row.get('name') or not normalize_email(row.get('email')):
+            raise ValueError("naam en e-mailadres zijn verplicht")
+        return row
+
+    def _import_chunk(self, chunk):
+        try:
+            with self.env.cr.savepoint():
+                self._import_rows(chunk)
+        except Exception:
+            # Blok mislukt: regel per regel opnieuw, zodat één foute regel de rest niet tegenhoudt
+            for line in chunk:
+                try:
+                    with self.env.cr.savepoint():
+                        self._import_rows([line])
+                except Exception as e:
+                    self._log_errors([(line[0], str(e))])
+        self.lines_done += len(chunk)
+
+    def _import_rows(self, lines):
+        Talent = self.env['wiz.recruitment.talentpool.talent'].sudo().with_context(
+            talentpool_defer_profile_changed=True)
+        rows, errors = [], []
+        for line_no, raw in lines:
+            try:
+                rows.append(self._parse_row(raw))
+            except (ValueError, TypeError) as e:
+                errors.append((line_no, str(e)))
+
+        # Dubbels tegen de pool in één lookup, en binnen het blok zelf
+        existing = Talent._search_by_dedup_keys(
+            [row.get('email') for row in rows], [row.get('linkedin_profile') for row in rows])
+        seen_emails = set(existing.mapped('email_key'))
+        seen_linkedin = set(existing.mapped('linkedin_key')) - {False}
+        new_rows = []
+        for row in rows:
+            email_key = normalize_email(row.get('email'))
+            linkedin_key = normalize_linkedin(row.get('linkedin_profile'))
+            if email_key in seen_emails or (linkedin_key and linkedin_key in seen_linkedin):
+                continue
+            seen_emails.add(email_key)
+            if linkedin_key:
+                seen_linkedin.add(linkedin_key)
+            new_rows.append(row)
+
+        talents = Talent.create([
+            {fname: row[fname] for fname in IMPORT_TALENT_FIELDS if row.get(fname)}
+            for row in new_rows
+        ])
+        for column, fname in IMPORT_CHILD_COLUMNS.items():
+            Child = self.env[Talent._fields[fname].comodel_name].sudo().with_context(
+                talentpool_defer_profile_changed=True)
+            allowed = PORTAL_PROFILE_FIELDS[fname]
+            vals_list = []
+            for talent, row in zip(talents, new_rows):
+                for vals in row.get(column) or []:
+                    vals = Child._portal_clean_vals(vals, allowed) if isinstance(vals, dict) else {}
+                    if vals.get('name'):
+                        vals_list.append(dict(vals, talent_id=talent.id))
+            Child.create(vals_list)
+        talents._profile_changed()
+
+        self.created_count += len(talents)
+        self.duplicate_count += len(rows) - len(new_rows)
+        self._log_errors(errors)
+
+    def _log_errors(self, errors):
+        if errors:
+            self.error_count += len(errors)
+            self.error_log = self._append_errors([f"Regel {line_no}: {message}" for line_no, message in errors])
+
+    def _append_errors(self, messages):
+        return '\n'.join(filter(None, [self.error_log] + messages))
@@ -0,0 +1,241 @@
+import re
+from collections import defaultdict
+from datetime import date
+
+from psycopg2.extras import execute_values
+
+from odoo import models, fields, api, tools
+
+MATCH_BATCH_SIZE = 1000
+
+# Gewicht van een skill per niveau
+LEVEL_WEIGHTS = {'beginner': 1.0, 'intermediate': 2.0, 'expert': 3.0}
+SEARCHING_FOR_WEIGHT = 0.5
+NOT_WANTED_WEIGHT = -1.0
+# Bonus per jaar ervaring, begrensd tot MAX_EXPERIENCE_YEARS
+EXPERIENCE_WEIGHT = 0.2
+MAX_EXPERIENCE_YEARS = 10
+
+WORD_RE = re.compile(r'\w[\w+#.]*\w|\w', re.UNICODE)
+STOPWORDS = {
+    'de', 'het', 'een', 'en', 'of', 'in', 'op', 'met', 'voor', 'van', 'naar', 'bij', 'als', 'die', 'dat',
+    'ik', 'je', 'wil', 'niet', 'geen', 'the', 'and', 'or', 'for', 'with', 'of', 'to', 'at', 'an',
+}
+
+
+def normalize_term(text):
+    """ Genormaliseerde vorm van een skill of trefwoord: kleine letters, enkele spaties. """
+    return ' '.join((text or '').lower().split())
+
+
+def extract_keywords(text):
+    """ Unieke trefwoorden (en bigrammen) uit vrije tekst. """
+    words = [word for word in WORD_RE.findall((text or '').lower()) if word not in STOPWORDS]
+    terms = {word for word in words if len(word) > 1}
+    terms.update(f'{first} {second}' for first, second in zip(words, words[1:]))
+    return terms
+
+
+class TalentFeature(models.Model):
+    _name = 'wiz.recruitment.talentpool.talent.feature'
+    _description = 'Matchingkenmerk van een talent'
+    _log_access = False
+
+    talent_id = fields.Many2one('wiz.recruitment.talentpool.talent', required=True, index=True, ondelete='cascade')
+    term = fields.Char(required=True, index=True)
+    weight = fields.Float(required=True)
+
+
+class Talent(models.Model):
+    _inherit = 'wiz.recruitment.talentpool.talent'
+
+    experience_years = fields.Float("Jaren ervaring", digits=(16, 1), readonly=True)
+    match_features_dirty = fields.Boolean(default=True, index=True, copy=False)
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'searching_for', 'not_wanted'} & vals.keys():
+            self._mark_match_features_dirty()
+        return res
+
+    def _profile_changed(self):
+        res = super()._profile_changed()
+        self._mark_match_features_dirty()
+        return res
+
+    def _mark_match_features_dirty(self):
+        if not self.ids:
+            return
+        self.env.cr.execute("""
+            UPDATE wiz_recruitment_talentpool_talent
+               SET match_features_dirty = true
+             WHERE id IN %s AND NOT match_features_dirty
+        """, (tuple(self.ids),))
+        self.invalidate_recordset(['match_features_dirty'])
+
+    def _rebuild_match_features(self):
+        """ Herbereken de kenmerkvectoren van deze talenten in één keer per blok. """
+        for batch in tools.split_every(MATCH_BATCH_SIZE, self.ids, self.browse):
+            batch._rebuild_match_features_batch()
+
+    def _rebuild_match_features_batch(self):
+        features = defaultdict(dict)
+        years = defaultdict(float)
+        today = date.today()
+
+        # Skills tellen met hun canonieke catalogussleutel, zodat aliassen samenvallen
+        _index, catalog = self.env['wiz.recruitment.talentpool.skill.catalog']._get_lookup()
+        catalog_keys = {catalog_id: key for catalog_id, key in catalog.values()}
+        for skill in self.env['recruitment.skill'].search_read(
+                [('talent_id', 'in', self.ids)], ['talent_id', 'name', 'level', 'catalog_id'], load=None):
+            term = catalog_keys.get(skill['catalog_id']) or normalize_term(skill['name'])
+            if term:
+                weight = LEVEL_WEIGHTS.get(skill['level'], 1.0)
+                vector = features[skill['talent_id']]
+                vector[term] = max(vector.get(term, 0.0), weight)
+
+        for exp in self.env['recruitment.experience'].search_read(
+                [('talent_id', 'in', self.ids), ('start_date', '!=', False)],
+                ['talent_id', 'start_date', 'end_date'], load=None):
+            years[exp['talent_id']] += max(((exp['end_date'] or today) - exp['start_date']).days, 0) / 365.25
+
+        for talent in self.read(['searching_for', 'not_wanted']):
+            vector = features[talent['id']]
+            for term in extract_keywords(talent['searching_for']):
+                vector.setdefault(term, SEARCHING_FOR_WEIGHT)
+            for term in extract_keywords(talent['not_wanted']):
+                vector[term] = NOT_WANTED_WEIGHT
+
+        cr = self.env.cr
+        cr.execute("DELETE FROM wiz_recruitment_talentpool_talent_feature WHERE talent_id IN %s", (tuple(self.ids),))
+        rows = [
+            (talent_id, term, weight)
+            for talent_id, vector in features.items()
+            for term, weight in vector.items()
+        ]
+        if rows:
+            execute_values(cr._obj, """
+                INSERT INTO wiz_recruitment_talentpool_talent_feature (talent_id, term, weight)
+                VALUES %s
+            """, rows, page_size=1000)
+        execute_values(cr._obj, """
+            UPDATE wiz_recruitment_talentpool_talent t
+               SET experience_years = v.years, match_features_dirty = false
+              FROM (VALUES %s) AS v(id, years)
+             WHERE t.id = v.id
+        """, [(talent_id, round(years[talent_id], 1)) for talent_id in self.ids], page_size=1000)
+        self.invalidate_recordset(['experience_years', 'match_features_dirty'])
+        self.env['wiz.recruitment.talentpool.talent.feature'].invalidate_model()
+
+    @api.model
+    def _cron_rebuild_match_features(self):
+        self.search([('match_features_dirty', '=', True)])._rebuild_match_features()
+
+    @api.model
+    def _rebuild_dirty_candidates(self, terms):
+        """ Werk enkel de verouderde kenmerken bij van talenten die voor ``terms`` kunnen scoren.
+
+        Kandidaten zijn talenten waarvan het zoekdocument een woord uit de termen
+        bevat, die een skill met een van de termen als catalogussleutel hebben of
+        die nu al een kenmerk voor een van de termen hebben; de rest van de pool
+        blijft voor de cron.
+        """
+        words = {word for term in terms for word in re.findall(r'\w+', term)}
+        if not words:
+            return
+        self.env.cr.execute("""
+            SELECT t.id
+              FROM wiz_recruitment_talentpool_talent t
+             WHERE t.match_features_dirty
+               AND (t.search_vector @@ to_tsquery('simple', %s)
+                    OR EXISTS (SELECT 1 FROM recruitment_skill s
+                                 JOIN wiz_recruitment_talentpool_skill_catalog c ON c.id = s.catalog_id
+                                WHERE s.talent_id = t.id AND c.key = ANY(%s))
+                    OR EXISTS (SELECT 1 FROM wiz_recruitment_talentpool_talent_feature f
+                                WHERE f.talent_id = t.id AND f.term = ANY(%s)))
+        """, [' | '.join(f"'{word}'" for word in words), list(terms), list(terms)])
+        self.browse([talent_id for talent_id, in self.env.cr.fetchall()])._rebuild_match_features()
+
+    @api.model
+    def _match_terms(self, terms, limit=50):
+        """ Rangschik de volledige pool tegen een gewogen termenvector.
+
+        Geeft een lijst van (talent_id, score) terug, hoogste score eerst.
+        Alles gebeurt in één SQL-aggregaat over de vooraf berekende kenmerken.
+        """
+        if not terms:
+            return []
+        self._rebuild_dirty_candidates(terms)
+        execute_values(self.env.cr._obj, """
+            WITH q(term, weight) AS (VALUES %s)
+            SELECT f.talent_id,
+                   SUM(f.weight * q.weight)
+                   + LEAST(MAX(t.experience_years), {max_years}) * {experience_weight} AS score
+              FROM wiz_recruitment_talentpool_talent_feature f
+              JOIN q ON q.term = f.term
+              JOIN wiz_recruitment_talentpool_talent t ON t.id = f.talent_id
+          GROUP BY f.talent_id
+            HAVING SUM(f.weight * q.weight) > 0
+          ORDER BY score DESC, f.talent_id
+             LIMIT {limit}
+        """.format(max_years=MAX_EXPERIENCE_YEARS, experience_weight=EXPERIENCE_WEIGHT, limit=int(limit)),
+            list(terms.items()), page_size=len(terms))
+        return self.env.cr.fetchall()
+
+
+class HrJob(models.Model):
+    _inherit = 'hr.job'
+
+    def _get_match_terms(self):
+        self.ensure_one()
+        text = ' '.join(filter(None, [self.name, tools.html2plaintext(self.description or '')]))
+        terms = dict.fromkeys(extract_keywords(text), 1.0)
+        # De functietitel zelf telt dubbel
+        terms.update(dict.fromkeys(extract_keywords(self.name), 2.0))
+        # Aliassen uit de skillcatalogus ("python3") op de canonieke skill afbeelden
+        canonical = self.env['wiz.recruitment.talentpool.skill.catalog']._canonical_keys(terms)
+        matched = {}
+        for term, weight in terms.items():
+            matched[canonical[term]] = max(matched.get(canonical[term], 0.0), weight)
+        return matched
+
+    def _match_talents(self, limit=50):
+        """ Top-N talenten voor deze vacature als lijst van (talent_id, score). """
+        return self.env['wiz.recruitment.talentpool.talent']._match_terms(self._get_match_terms(), limit=limit)
+
+    def action_match_talents(self):
+        # De scores worden bewaard, zodat de lijst op rangschikking sorteert
+        results = self.env['wiz.recruitment.talentpool.match.result'].create([
+            {'job_id': self.id, 'talent_id': talent_id, 'score': score}
+            for talent_id, score in self._match_talents()
+        ])
+        return {
+            'type': 'ir.actions.act_window',
+            'name': "Passende talenten",
+            'res_model': 'wiz.recruitment.talentpool.match.result',
+            'view_mode': 'tree',
+            'domain': [('id', 'in', results.ids)],
+            'target': 'current',
+        }
+
+
+class MatchResult(models.TransientModel):
+    _name = 'wiz.recruitment.talentpool.match.result'
+    _description = 'Passend talent voor een vacature'
+    _order = 'score desc, id'
+
+    job_id = fields.Many2one('hr.job', string="Vacature", required=True, ondelete='cascade')
+    talent_id = fields.Many2one('wiz.recruitment.talentpool.talent', string="Talent", required=True, ondelete='cascade')
+    score = fields.Float("Matchscore", readonly=True)
+    email = fields.Char(related='talent_id.email')
+    experience_years = fields.Float(related='talent_id.experience_years')
+
+    def action_open_talent(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': 'wiz.recruitment.talentpool.talent',
+            'res_id': self.talent_id.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
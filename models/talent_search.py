@@ -0,0 +1,148 @@
+import re
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.osv import expression
+from odoo.tools.sql import column_exists, create_column
+
+from .skill_catalog import normalize_skill
+
+# Velden van het talent zelf die in de zoekindex zitten
+SEARCH_FIELDS = {'name', 'searching_for', 'notes', 'cv_text'}
+
+# Zoekterm skill:niveau, bv. python:expert of "machine learning":beginner
+SKILL_LEVEL_RE = re.compile(r'(?:"([^"]+)"|([^\s":]+)):(beginner|intermediate|expert)\b', re.IGNORECASE)
+
+# Zoekdocument per talent; skills en functies wegen het zwaarst
+SEARCH_VECTOR_SQL = """
+    UPDATE wiz_recruitment_talentpool_talent t
+       SET search_vector =
+              setweight(to_tsvector('simple', COALESCE(t.name, '')), 'A')
+           || setweight(to_tsvector('simple', COALESCE((
+                  SELECT string_agg(concat_ws(' ', s.name, s.level), ' ')
+                    FROM recruitment_skill s WHERE s.talent_id = t.id), '')), 'A')
+           || setweight(to_tsvector('simple', COALESCE(t.searching_for, '')), 'B')
+           || setweight(to_tsvector('simple', COALESCE((
+                  SELECT string_agg(concat_ws(' ', e.name, e.company, e.description), ' ')
+                    FROM recruitment_experience e WHERE e.talent_id = t.id), '')), 'B')
+           || setweight(to_tsvector('simple', COALESCE((
+                  SELECT string_agg(concat_ws(' ', d.name, d.institute), ' ')
+                    FROM recruitment_education d WHERE d.talent_id = t.id), '')), 'C')
+           || setweight(to_tsvector('simple', COALESCE(t.notes, '')), 'C')
+           || setweight(to_tsvector('simple', COALESCE(t.cv_text, '')), 'D')
+"""
+
+
+class Talent(models.Model):
+    _inherit = 'wiz.recruitment.talentpool.talent'
+
+    # Zoekveld voor de zoekweergave; de tsvector-kolom zelf beheert init()
+    fulltext = fields.Char("Profiel bevat", compute='_compute_fulltext', search='_search_fulltext')
+
+    def init(self):
+        super().init()
+        cr = self.env.cr
+        if not column_exists(cr, self._table, 'search_vector'):
+            create_column(cr, self._table, 'search_vector', 'tsvector')
+            cr.execute(SEARCH_VECTOR_SQL)
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS wiz_recruitment_talentpool_talent_search_vector_idx
+                ON wiz_recruitment_talentpool_talent USING gin (search_vector)
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        talents = super().create(vals_list)
+        talents._update_search_vector()
+        return talents
+
+    def write(self, vals):
+        res = super().write(vals)
+        if SEARCH_FIELDS & vals.keys():
+            self._update_search_vector()
+        return res
+
+    def _profile_changed(self):
+        res = super()._profile_changed()
+        self._update_search_vector()
+        return res
+
+    def _update_search_vector(self):
+        """ Werk de tsvector van enkel deze talenten bij. """
+        if not self.ids:
+            return
+        self.flush_recordset(list(SEARCH_FIELDS))
+        for model in ('recruitment.skill', 'recruitment.experience', 'recruitment.education'):
+            self.env[model].flush_model()
+        self.env.cr.execute(SEARCH_VECTOR_SQL + " WHERE t.id IN %s", (tuple(self.ids),))
+
+    def _compute_fulltext(self):
+        self.fulltext = False
+
+    def _search_fulltext(self, operator, value):
+        if operator in ('ilike', '=', 'like'):
+            subquery_operator = 'inselect'
+        elif operator in ('not ilike', '!=', 'not like'):
+            subquery_operator = 'not inselect'
+        else:
+            raise UserError(f"Zoeken op profielinhoud ondersteunt de operator {operator!r} niet.")
+        where, params, _text = self._fulltext_where(value or '')
+        if not where:
+            # Lege zoekopdracht: alles voor een positieve, niets voor een negatieve operator
+            return expression.TRUE_DOMAIN if subquery_operator == 'inselect' else expression.FALSE_DOMAIN
+        return [('id', subquery_operator, (
+            f"SELECT t.id FROM wiz_recruitment_talentpool_talent t WHERE {where}", params,
+        ))]
+
+    @api.model
+    def _fulltext_where(self, query):
+        """ SQL-voorwaarde (op alias ``t``) voor een zoekopdracht.
+
+        Termen ``skill:niveau`` filteren via recruitment_skill op de canonieke
+        skill én het niveau; de rest van de query gaat naar de tsvector.
+        Geeft ``(where, params, tekstquery)`` terug, met ``where`` leeg als er
+        niets te zoeken valt.
+        """
+        Catalog = self.env['wiz.recruitment.talentpool.skill.catalog']
+        conditions, params = [], []
+        skill_terms = [(normalize_skill(quoted or bare), level.lower())
+                       for quoted, bare, level in SKILL_LEVEL_RE.findall(query)]
+        if skill_terms:
+            self.env['recruitment.skill'].flush_model(['talent_id', 'level', 'catalog_id'])
+            canonical = Catalog._canonical_keys({key for key, _level in skill_terms})
+            for key, level in skill_terms:
+                conditions.append("""EXISTS (
+                    SELECT 1 FROM recruitment_skill s
+                      JOIN wiz_recruitment_talentpool_skill_catalog c ON c.id = s.catalog_id
+                     WHERE s.talent_id = t.id AND c.key = %s AND s.level = %s)""")
+                params += [canonical[key], level]
+        text = SKILL_LEVEL_RE.sub(' ', query).strip()
+        if text:
+            conditions.append("t.search_vector @@ websearch_to_tsquery('simple', %s)")
+            params.append(text)
+        return ' AND '.join(conditions), params, text
+
+    @api.model
+    def search_fulltext(self, query, limit=80, offset=0):
+        """ Talenten gerangschikt op relevantie voor een vrije zoekopdracht.
+
+        De query volgt de websearch-syntax van PostgreSQL, bv.
+        ``python expert "rotterdam" -stage``; ``python:expert`` zoekt enkel
+        talenten met die skill op dat niveau.
+        """
+        where, params, text = self._fulltext_where(query or '')
+        if not where:
+            return self.browse()
+        # Eerst de toegangsregels toepassen en pas daarna pagineren, zodat
+        # ontoegankelijke talenten een pagina niet korter maken
+        allowed, allowed_params = self._search([('id', 'inselect', (
+            f"SELECT t.id FROM wiz_recruitment_talentpool_talent t WHERE {where}", params,
+        ))]).subselect()
+        self.env.cr.execute(f"""
+            SELECT t.id
+              FROM wiz_recruitment_talentpool_talent t
+             WHERE t.id IN ({allowed})
+          ORDER BY ts_rank_cd(t.search_vector, websearch_to_tsquery('simple', %s)) DESC, t.id
+             LIMIT %s OFFSET %s
+        """, [*allowed_params, text, limit, offset])
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
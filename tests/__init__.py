@@ -0,0 +1,2 @@
+from . import test_talent_performance
+from . import test_portal_performance
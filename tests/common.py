@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from odoo.tests.common import new_test_user
+
+_logger = logging.getLogger(__name__)
+
+# Schaal van de synthetische data: TALENTPOOL_BENCH_SCALE=10 geeft 10x zoveel records
+BENCH_SCALE = max(int(os.environ.get('TALENTPOOL_BENCH_SCALE', '1')), 1)
+# Pad van het JSON-rapport; zonder waarde worden de resultaten enkel gelogd
+BENCH_REPORT = os.environ.get('TALENTPOOL_BENCH_REPORT')
+
+BENCH_RESULTS = []
+
+
+class TalentPoolBenchmarkCommon:
+    """ Gedeelde datageneratie en metingen voor de benchmarks. """
+
+    TALENT_COUNT = 100
+    APPLICANT_COUNT = 100
+    CHILDREN_PER_TALENT = 3
+
+    @classmethod
+    def _generate_talents(cls, env, count, children=CHILDREN_PER_TALENT, prefix='bench'):
+        talents = env['wiz.recruitment.talentpool.talent'].sudo().create([{
+            'name': f'Talent {prefix} {index}',
+            'email': f'{prefix}.talent.{index}@example.com',
+            'linkedin_profile': f'https://www.linkedin.com/in/{prefix}-talent-{index}/',
+            'searching_for': 'Python ontwikkelaar in Rotterdam',
+            'not_wanted': 'Nachtdiensten',
+            'last_update_date': date.today() - timedelta(days=index % 730),
+        } for index in range(count)])
+        start = date.today() - timedelta(days=3 * 365)
+        env['recruitment.education'].sudo().create([{
+            'name': f'Opleiding {index}',
+            'institute': 'Hogeschool Rotterdam',
+            'start_date': start,
+            'end_date': start + timedelta(days=365),
+            'talent_id': talent.id,
+        } for talent in talents for index in range(children)])
+        env['recruitment.experience'].sudo().create([{
+            'name': f'Ontwikkelaar {index}',
+            'company': 'Wiz',
+            'start_date': start,
+            'description': 'Backendontwikkeling in Python en PostgreSQL',
+            'talent_id': talent.id,
+        } for talent in talents for index in range(children)])
+        env['recruitment.skill'].sudo().create([{
+            'name': skill,
+            'level': level,
+            'talent_id': talent.id,
+        } for talent in talents for skill, level in [
+            ('Python', 'expert'), ('PostgreSQL', 'intermediate'), ('Odoo', 'beginner'),
+        ][:children]])
+        return talents
+
+    @classmethod
+    def _generate_applicants(cls, env, count, prefix='bench', duplicate_every=5):
+        # Elke duplicate_every-de sollicitant deelt zijn e-mailadres met de vorige
+        return env['hr.applicant'].sudo().create([{
+            'name': f'Sollicitatie {prefix} {index}',
+            'partner_name': f'Sollicitant {prefix} {index}',
+            'email_from': f'{prefix}.applicant.{index - 1 if index % duplicate_every == 1 else index}@example.com',
+            'linkedin_profile': f'https://www.linkedin.com/in/{prefix}-applicant-{index}',
+            'description': 'Via jobbeurs',
+        } for index in range(count)])
+
+    @classmethod
+    def _generate_portal_talent(cls, env, login='talent_bench'):
+        user = new_test_user(env, login=login, groups='base.group_portal')
+        talent = cls._generate_talents(env, 1, prefix=login)
+        talent.portal_user_id = user
+        return user, talent
+
+    @contextmanager
+    def _benchmark(self, name, records=0):
+        """ Meet wandtijd en aantal SQL-queries van het blok en bewaar het resultaat. """
+        self.env.flush_all()
+        cr = self.env.cr
+        queries_before = cr.sql_log_count
+        started = time.perf_counter()
+        yield
+        self.env.flush_all()
+        result = {
+            'name': name,
+            'scale': BENCH_SCALE,
+            'records': records,
+            'queries': cr.sql_log_count - queries_before,
+            'seconds': round(time.perf_counter() - started, 4),
+        }
+        BENCH_RESULTS.append(result)
+        _logger.info("Benchmark %(name)s: %(queries)s queries, %(seconds)ss voor %(records)s records", result)
+
+    @classmethod
+    def _write_bench_report(cls):
+        if BENCH_REPORT:
+            with open(BENCH_REPORT, 'w') as report:
+                json.dump(BENCH_RESULTS, report, indent=2)
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+
+from freezegun import freeze_time
+
+from odoo import http
+from odoo.exceptions import AccessError
+from odoo.tests import tagged
+from odoo.tests.common import HttpCase
+
+from .common import BENCH_SCALE, TalentPoolBenchmarkCommon
+
+PORTAL_PAGES = [
+    '/my/talent',
+    '/my/applications',
+    '/my/apply',
+    '/my/education',
+    '/my/education/add',
+    '/my/education/edit',
+    '/my/experience',
+    '/my/experience/add',
+    '/my/experience/edit',
+    '/my/skills',
+    '/my/skills/add',
+    '/my/skills/edit',
+]
+
+# Maximaal aantal queries per portaalpagina, onafhankelijk van de profielgrootte
+PAGE_QUERY_BUDGET = 60
+
+
+@tagged('post_install', '-at_install', 'talentpool_bench')
+class TestPortalPerformance(TalentPoolBenchmarkCommon, HttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user, cls.talent = cls._generate_portal_talent(cls.env)
+        cls.other_talent = cls._generate_talents(cls.env, cls.TALENT_COUNT * BENCH_SCALE)[0]
+        cls.job = cls.env['hr.job'].create({'name': 'Python ontwikkelaar'})
+        cls.env['hr.applicant'].create([{
+            'name': f'Sollicitatie {index}',
+            'talent_id': cls.talent.id,
+            'job_id': cls.job.id,
+        } for index in range(10 * BENCH_SCALE)])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._write_bench_report()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate(self.user.login, self.user.login)
+
+    def _assert_route(self, url, data=None, budget=PAGE_QUERY_BUDGET):
+        # Eerst één keer opwarmen, dan de tweede aanroep meten
+        if data is None:
+            self.url_open(url)
+        with self._benchmark(url):
+            queries_before = self.cr.sql_log_count
+            response = self.url_open(url, data=data, allow_redirects=False)
+            queries = self.cr.sql_log_count - queries_before
+        self.assertIn(response.status_code, (200, 303), url)
+        self.assertLessEqual(queries, budget, f"{url}: {queries} queries")
+
+    def test_portal_pages(self):
+        for url in PORTAL_PAGES:
+            with self.subTest(url=url):
+                self._assert_route(url)
+
+    def test_portal_page_cache(self):
+        # Ongewijzigd profiel: 304 op de ETag, een wijziging geeft een nieuwe ETag
+        response = self.url_open('/my/talent')
+        etag = response.headers['ETag']
+        with self._benchmark('/my/talent (304)'):
+            queries_before = self.cr.sql_log_count
+            response = self.url_open('/my/talent', headers={'If-None-Match': etag})
+            queries = self.cr.sql_log_count - queries_before
+        self.assertEqual(response.status_code, 304)
+        self.assertLessEqual(queries, PAGE_QUERY_BUDGET // 2, f"/my/talent (304): {queries} queries")
+        # De ETag hangt niet af van de tijd (zoals het CSRF-token wel doet)
+        with freeze_time(datetime.now() + timedelta(minutes=5)):
+            response = self.url_open('/my/talent', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.talent.notes = 'Bijgewerkt'
+        response = self.url_open('/my/talent', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        # Een hernoemde vacature staat in de sollicitatielijst van het profiel
+        etag = response.headers['ETag']
+        self.job.name = 'Senior Python ontwikkelaar'
+        response = self.url_open('/my/talent', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_portal_submits(self):
+        csrf_token = http.Request.csrf_token(self)
+        for url, data in [
+            ('/my/talent/update', {'searching_for': 'Data engineering', 'not_wanted': '', 'notes': ''}),
+            ('/my/education/add/submit', {'name': 'Master', 'institute': 'TU Delft'}),
+            ('/my/experience/add/submit', {'name': 'Lead', 'company': 'Wiz', 'description': 'Python'}),
+            ('/my/skills/add/submit', {'name': 'Docker', 'level': 'intermediate'}),
+            ('/my/apply/submit', {'job_id': self.job.id}),
+            ('/my/profile/bulk_edit', self._bulk_edit_form()),
+        ]:
+            with self.subTest(url=url):
+                self._assert_route(url, data=dict(data, csrf_token=csrf_token))
+
+    def test_portal_bulk_edit_foreign_rows(self):
+        # Regels van een ander talent kunnen niet bewerkt of verwijderd worden
+        foreign = self.other_talent.experience_ids
+        names = foreign.mapped('name')
+        own = self.talent.experience_ids
+        own_names = own.mapped('name')
+        form = {
+            'section': 'experience',
+            'record_ids': foreign.ids,
+            'delete_ids': foreign[:1].ids,
+            'csrf_token': http.Request.csrf_token(self),
+        }
+        for exp in foreign:
+            form[f'name_{exp.id}'] = 'Overgenomen'
+        response = self.url_open('/my/profile/bulk_edit', data=form, allow_redirects=False)
+        self.assertEqual(response.status_code, 403)
+        # Ook niet samen met eigen regels: de hele bewerking wordt geweigerd
+        talent = self.env['wiz.recruitment.talentpool.talent'].with_user(self.user)._get_portal_talent()
+        with self.assertRaises(AccessError):
+            talent._portal_apply_profile_changes({'experience_ids': {
+                'update': {exp.id: {'name': 'Overgenomen'} for exp in own | foreign},
+                'delete': foreign[:1].ids,
+            }})
+        self.env.invalidate_all()
+        self.assertEqual(foreign.exists(), foreign)
+        self.assertEqual(foreign.mapped('name'), names)
+        self.assertEqual(own.mapped('name'), own_names)
+
+    def _bulk_edit_form(self):
+        experiences = self.talent.experience_ids
+        form = {
+            'section': 'experience',
+            'record_ids': experiences.ids,
+            'delete_ids': experiences[:1].ids,
+            'new_name': 'Architect', 'new_company': 'Wiz', 'new_start_date': '', 'new_end_date': '',
+            'new_description': '',
+        }
+        for exp in experiences:
+            form[f'name_{exp.id}'] = f'{exp.name} (bijgewerkt)'
+        return form
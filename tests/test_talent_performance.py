@@ -0,0 +1,390 @@
+import base64
+import io
+import json
+import zipfile
+from unittest.mock import patch
+
+from odoo import SUPERUSER_ID, api, fields
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase, new_test_user
+
+from odoo.addons.wiz_recruitment_talentpool.models.cv_extraction import CV_MAX_ATTEMPTS, DOCX_MIMETYPE
+
+from .common import BENCH_SCALE, TalentPoolBenchmarkCommon
+
+
+def _docx(text):
+    """ Minimaal DOCX-bestand met één alinea. """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as docx:
+        docx.writestr('word/document.xml', (
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:body></w:document>'))
+    return buffer.getvalue()
+
+
+@tagged('post_install', '-at_install', 'talentpool_bench')
+class TestTalentPerformance(TalentPoolBenchmarkCommon, TransactionCase):
+    """ Querybudgetten voor de batchpaden; ze mogen niet meegroeien met het aantal records. """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.talents = cls._generate_talents(cls.env, cls.TALENT_COUNT * BENCH_SCALE)
+        cls.applicants = cls._generate_applicants(cls.env, cls.APPLICANT_COUNT * BENCH_SCALE)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._write_bench_report()
+        super().tearDownClass()
+
+    def test_convert_to_talent(self):
+        applicant = self.applicants[0]
+        with self._benchmark('action_convert_to_talent', 1), self.assertQueryCount(__system__=40):
+            applicant.action_convert_to_talent()
+        self.assertTrue(applicant.talent_id)
+
+    def test_bulk_convert_to_talent(self):
+        with self._benchmark('action_bulk_convert_to_talent', len(self.applicants)), \
+                self.assertQueryCount(__system__=60):
+            self.applicants.action_bulk_convert_to_talent()
+        self.assertFalse(self.applicants.filtered(lambda a: not a.talent_id))
+        # Sollicitanten met hetzelfde e-mailadres delen één talent
+        self.assertLess(len(self.applicants.talent_id), len(self.applicants))
+
+    def test_bulk_convert_shared_linkedin(self):
+        # B deelt het LinkedIn-profiel van A, C deelt het nieuwe e-mailadres van B
+        a, b, c = self.env['hr.applicant'].create([
+            {'name': 'A', 'email_from': 'a.shared@example.com', 'linkedin_profile': 'https://linkedin.com/in/shared-a'},
+            {'name': 'B', 'email_from': 'b.shared@example.com', 'linkedin_profile': 'https://linkedin.com/in/shared-a'},
+            {'name': 'C', 'email_from': 'b.shared@example.com'},
+        ])
+        (a | b | c).action_bulk_convert_to_talent()
+        self.assertTrue(a.talent_id)
+        self.assertEqual(b.talent_id, a.talent_id)
+        self.assertEqual(c.talent_id, a.talent_id)
+
+    def test_copy_talent_data_to_applicant(self):
+        talent = self.talents[0]
+        applicant = self.env['hr.applicant'].create({'name': 'Kopie', 'talent_id': talent.id})
+        with self._benchmark('copy_talent_data_to_applicant', 1), self.assertQueryCount(__system__=30):
+            applicant.copy_talent_data_to_applicant(talent)
+        self.assertEqual(len(applicant.skill_ids), len(talent.skill_ids))
+        self.assertEqual(len(applicant.experience_ids), len(talent.experience_ids))
+        self.assertEqual(len(applicant.education_ids), len(talent.education_ids))
+
+    def test_reapply(self):
+        with self._benchmark('action_reapply', len(self.talents)), self.assertQueryCount(__system__=80):
+            action = self.talents.action_reapply()
+        applicants = self.env['hr.applicant'].search(action['domain'])
+        self.assertEqual(len(applicants), len(self.talents))
+        self.assertEqual(len(applicants.skill_ids), len(self.talents.skill_ids))
+
+    def test_import_jsonl(self):
+        count = self.TALENT_COUNT * BENCH_SCALE
+        lines = [json.dumps({
+            'name': f'Talent import {index}',
+            'email': f'import.talent.{index}@example.com',
+            'education': [{'name': 'Bachelor Informatica', 'start_date': '2019-09-01'}],
+            'experience': [{'name': 'Ontwikkelaar', 'company': 'Wiz'}],
+            'skills': [{'name': 'Python', 'level': 'expert'}],
+        }) for index in range(count)]
+        # Eén dubbel met de bestaande pool en één ongeldige regel
+        lines += [json.dumps({'name': 'Dubbel', 'email': self.talents[0].email.upper()}), '{"name": "Zonder e-mail"}']
+        talent_import = self.env['wiz.recruitment.talentpool.import'].create({
+            'file': base64.b64encode('\n'.join(lines).encode()),
+            'filename': 'talenten.jsonl',
+            'chunk_size': count + 2,
+        })
+        with self._benchmark('talent_import_jsonl', len(lines)), self.assertQueryCount(__system__=80):
+            talent_import._run()
+        self.assertEqual(talent_import.state, 'done')
+        self.assertEqual(talent_import.lines_done, len(lines))
+        self.assertEqual(talent_import.created_count, count)
+        self.assertEqual(talent_import.duplicate_count, 1)
+        self.assertEqual(talent_import.error_count, 1)
+        imported = self.env['wiz.recruitment.talentpool.talent'].search([('email', '=like', 'import.talent.%')])
+        self.assertEqual(len(imported.skill_ids), count)
+
+    def test_fulltext_search(self):
+        Talent = self.env['wiz.recruitment.talentpool.talent']
+        beginner = self._generate_talents(self.env, 1, children=0, prefix='zoek')
+        self.env['recruitment.skill'].create({'name': 'python', 'level': 'beginner', 'talent_id': beginner.id})
+        self.assertIn(beginner, Talent.search_fulltext('python:beginner'))
+        self.assertNotIn(beginner, Talent.search_fulltext('python:expert'))
+        self.assertIn(self.talents[0], Talent.search_fulltext('python:expert'))
+        # Negatieve operatoren sluiten uit in plaats van alles terug te geven
+        matches = Talent.search([('fulltext', 'ilike', 'python:beginner')])
+        self.assertNotIn(beginner, Talent.search([('fulltext', 'not ilike', 'python:beginner')]))
+        self.assertIn(beginner, matches)
+        self.assertNotIn(self.talents[0], matches)
+        # Toegangsregels gelden vóór het pagineren: een verborgen talent maakt de pagina niet leeg
+        hidden, visible = self._generate_talents(self.env, 2, children=0, prefix='verborgen')
+        hidden.searching_for = 'Zeldzaamwoord en nog eens zeldzaamwoord'
+        visible.searching_for = 'Zeldzaamwoord'
+        self.env['ir.rule'].create({
+            'name': 'Verborgen talent',
+            'model_id': self.env['ir.model']._get_id('wiz.recruitment.talentpool.talent'),
+            'domain_force': f"[('id', '!=', {hidden.id})]",
+        })
+        user = new_test_user(self.env, login='zoeker',
+                             groups='base.group_user,wiz_recruitment_talentpool.group_talentpool_user')
+        self.assertEqual(Talent.search_fulltext('zeldzaamwoord', limit=1), hidden)
+        self.assertEqual(Talent.with_user(user).search_fulltext('zeldzaamwoord', limit=1), visible)
+
+    def test_match_talents(self):
+        nurse = self.env['wiz.recruitment.talentpool.talent'].create({
+            'name': 'Zorgtalent', 'email': 'zorg.talent@example.com', 'searching_for': 'Verpleegkundige',
+        })
+        job = self.env['hr.job'].create({'name': 'Python ontwikkelaar'})
+        action = job.action_match_talents()
+        results = self.env[action['res_model']].search(action['domain'])
+        self.assertTrue(results)
+        self.assertEqual(results.mapped('score'), sorted(results.mapped('score'), reverse=True))
+        # Talenten die niet kunnen scoren, worden niet tijdens de request herberekend
+        self.assertTrue(nurse.match_features_dirty)
+
+    def test_export_iter_rows(self):
+        Talent = self.env['wiz.recruitment.talentpool.talent']
+        domain = [('id', 'in', self.talents.ids)]
+        # Vaste kost per batch: talenten, drie kindmodellen en sollicitaties
+        with self._benchmark('export_iter_rows', len(self.talents)), self.assertQueryCount(__system__=20):
+            rows = list(Talent._export_iter_rows(domain, batch_size=len(self.talents)))
+        self.assertEqual([row['id'] for row in rows], self.talents.ids)
+        self.assertEqual(len(rows[0]['skills']), self.CHILDREN_PER_TALENT)
+
+    def test_export_csv(self):
+        export = self.env['wiz.recruitment.talentpool.export'].create({
+            'file_format': 'csv',
+            'domain': repr([('id', 'in', self.talents.ids)]),
+        })
+        export._run()
+        self.assertEqual(export.state, 'done')
+        self.assertEqual(export.talent_count, len(self.talents))
+        lines = export.attachment_id.raw.decode().splitlines()
+        self.assertEqual(len(lines), len(self.talents) + 1)
+
+    def test_instrumentation(self):
+        applicant = self.env['hr.applicant'].create({'name': 'Meting', 'talent_id': self.talents[0].id})
+        applicant.copy_talent_data_to_applicant(self.talents[0])
+        Sample = self.env['wiz.recruitment.talentpool.perf.sample']
+        Sample._cron_flush()
+        sample = Sample.search([('name', '=', 'hr.applicant.copy_talent_data_to_applicant')], limit=1)
+        self.assertTrue(sample)
+        self.assertGreater(sample.query_count, 0)
+        self.assertEqual(sample.record_count, 1)
+        summary = self.env['wiz.recruitment.talentpool.perf.summary'].search([('name', '=', sample.name)])
+        self.assertGreaterEqual(summary.call_count, 1)
+
+    def test_skill_catalog(self):
+        Catalog = self.env['wiz.recruitment.talentpool.skill.catalog']
+        python = self.talents.skill_ids.filtered(lambda skill: skill.name == 'Python').catalog_id
+        self.assertEqual(len(python), 1)
+        skill = self.env['recruitment.skill'].create({'name': ' PYTHON ', 'talent_id': self.talents[0].id})
+        self.assertEqual(skill.catalog_id, python)
+
+        self.env['wiz.recruitment.talentpool.skill.alias'].create({'name': 'python3', 'catalog_id': python.id})
+        self.assertEqual(self.env['recruitment.skill'].create({'name': 'Python3'}).catalog_id, python)
+
+        Catalog._autocomplete('py')
+        # Na het opbouwen van de prefixindex kost autocomplete enkel de versiecontrole
+        with self.assertQueryCount(__system__=1):
+            suggestions = Catalog._autocomplete('pyth')
+        self.assertEqual(suggestions, [{'id': python.id, 'name': python.name}])
+        # Een hernoemde skill geeft een nieuwe versie van de index
+        python.name = 'Python (taal)'
+        self.assertEqual(Catalog._autocomplete('pyth'), [{'id': python.id, 'name': 'Python (taal)'}])
+        # Bestaande en nieuwe skills in één keer, zonder dubbele catalogusrijen
+        resolved = Catalog._resolve(['Python (taal)', 'Haskell', ' haskell '])
+        self.assertEqual(resolved['python (taal)'], python.id)
+        self.assertEqual(Catalog.search([('key', '=', 'haskell')]).id, resolved['haskell'])
+
+    def test_application_stats(self):
+        talent = self.talents[0]
+        applicants = self.env['hr.applicant'].create([
+            {'name': f'Teller {index}', 'talent_id': talent.id} for index in range(3)
+        ])
+        self.assertEqual(talent.application_count, 3)
+        self.assertEqual(talent.active_application_count, 3)
+        self.assertEqual(talent.last_application_date, max(applicants.mapped('create_date')))
+        applicants[0].action_archive()
+        self.assertEqual(talent.application_count, 3)
+        self.assertEqual(talent.active_application_count, 2)
+        applicants[1].talent_id = self.talents[1]
+        self.assertEqual(talent.application_count, 2)
+        self.assertEqual(self.talents[1].application_count, 1)
+        applicants[2].unlink()
+        self.assertEqual(talent.application_count, 1)
+
+    def test_provision_portal_users(self):
+        talents = self.talents[:20]
+        existing = self.env['res.users'].create({
+            'name': 'Bestaand', 'login': talents[0].email_key, 'email': talents[0].email,
+            'groups_id': [(6, 0, [self.env.ref('base.group_portal').id])],
+        })
+        with self._benchmark('action_provision_portal_users', len(talents)):
+            queries = self._count_queries(talents.action_provision_portal_users)
+        # Dubbel zoveel talenten kost niet meer queries (enkel wat marge voor eenmalige lookups)
+        self.assertLessEqual(self._count_queries(self.talents[20:60].action_provision_portal_users), queries + 10)
+        self.assertEqual(talents[0].portal_user_id, existing)
+        self.assertFalse(talents.filtered(lambda t: not t.portal_user_id))
+        self.assertEqual(set(talents.mapped('portal_mail_pending')), {'invite'})
+
+        # Een tweede keer slaat alles over; uitnodigingen gaan via de mailwachtrij
+        talents.action_provision_portal_users()
+        self.env['wiz.recruitment.talentpool.talent']._cron_send_portal_mails()
+        self.assertFalse(talents.filtered('portal_mail_pending'))
+        mails = self.env['mail.mail'].search([('model', '=', 'res.users'), ('res_id', 'in', talents.portal_user_id.ids)])
+        self.assertEqual(len(mails), len(talents))
+        self.assertEqual(set(mails.mapped('state')), {'outgoing'})
+
+    def _count_queries(self, func):
+        self.env.flush_all()
+        queries_before = self.cr.sql_log_count
+        func()
+        self.env.flush_all()
+        return self.cr.sql_log_count - queries_before
+
+    def test_purge_marked_talents(self):
+        Talent = self.env['wiz.recruitment.talentpool.talent']
+        deleted, anonymized, internal, kept = self._generate_talents(self.env, 4, prefix='avg')
+        deleted_user = new_test_user(self.env, login='avg_deleted', groups='base.group_portal')
+        anonymized_user = new_test_user(self.env, login='avg_anonymized', groups='base.group_portal')
+        internal_user = new_test_user(self.env, login='avg_internal', groups='base.group_user')
+        deleted.portal_user_id = deleted_user
+        anonymized.portal_user_id = anonymized_user
+        internal.portal_user_id = internal_user
+        deleted_partner = deleted_user.partner_id
+        # Een verwijzing die de purge niet opruimt, zodat deze gebruiker niet verwijderd kan worden
+        self.cr.execute("CREATE TEMP TABLE avg_reference (user_id integer REFERENCES res_users ON DELETE RESTRICT)")
+        self.cr.execute("INSERT INTO avg_reference VALUES (%s)", [anonymized_user.id])
+        to_purge = deleted | anonymized | internal
+        to_purge.marked_for_deletion = True
+
+        counts = to_purge._purge_in_batches(dry_run=True)
+        self.assertEqual(counts['talents'], 3)
+        self.assertEqual(counts['portal_users'], 2)
+        self.assertEqual(counts['skills'], 3 * self.CHILDREN_PER_TALENT)
+        self.assertEqual(to_purge.exists(), to_purge)
+
+        with self._benchmark('cron_purge_marked_talents', len(to_purge)):
+            Talent._cron_purge_marked_talents()
+        self.assertFalse(to_purge.exists())
+        self.assertTrue(kept.exists())
+        self.assertFalse(deleted_user.exists())
+        self.assertFalse(deleted_partner.exists())
+        # Niet verwijderbaar: persoonsgegevens gewist en gearchiveerd
+        self.assertFalse(anonymized_user.active)
+        self.assertTrue(anonymized_user.login.startswith('avg-verwijderd-'))
+        self.assertEqual(anonymized_user.partner_id.name, "Verwijderd talent")
+        self.assertFalse(anonymized_user.partner_id.email)
+        # Interne gebruikers blijven ongemoeid
+        self.assertTrue(internal_user.active)
+        self.assertEqual(internal_user.login, 'avg_internal')
+
+    def test_change_feed(self):
+        Change = self.env['wiz.recruitment.talentpool.change']
+        # De test draait in één transactie: die eigen, niet gecommitte rijen ook vrijgeven
+        released = patch.object(type(Change), '_released_sql', lambda self: (
+            "(c.txid < txid_snapshot_xmin(txid_current_snapshot()) OR c.txid = txid_current_if_assigned())"))
+        self.startPatcher(released)
+        cursor = Change.get_head_cursor()
+
+        talent, deleted = self.talents[:2]
+        self.env['recruitment.skill'].create({'name': 'Rust', 'level': 'beginner', 'talent_id': talent.id})
+        talent.experience_ids[:1].unlink()
+        deleted.unlink()
+        with self._benchmark('change_feed_page', 2), self.assertQueryCount(__system__=20):
+            page = Change.get_changes(cursor)
+        self.assertEqual([row['id'] for row in page['upserts']], [talent.id])
+        self.assertIn('Rust', [skill['name'] for skill in page['upserts'][0]['skills']])
+        self.assertEqual(page['deletes'], [deleted.id])
+        self.assertFalse(page['has_more'])
+        self.assertEqual(Change.get_changes(page['cursor'])['upserts'], [])
+        # Sollicitaties staan in het document van het talent
+        self.env['hr.applicant'].create({'name': 'Feed', 'talent_id': self.talents[2].id})
+        self.assertEqual([row['id'] for row in Change.get_changes(page['cursor'])['upserts']], [self.talents[2].id])
+
+    def test_merge_duplicates(self):
+        survivor, duplicate = self.talents[:2]
+        survivor.phone = '+31 6 1234 5678'
+        duplicate.phone = '06-12345678'
+        applicant = self.env['hr.applicant'].create({'name': 'Dubbel', 'talent_id': duplicate.id})
+        skill_count = len(survivor.skill_ids)
+        experiences = survivor.experience_ids | duplicate.experience_ids
+
+        Duplicate = self.env['wiz.recruitment.talentpool.duplicate']
+        groups = Duplicate._detect()
+        group = groups.filtered(lambda g: survivor in g.talent_ids)
+        self.assertEqual(group.talent_ids, survivor | duplicate)
+        self.assertEqual(group.reasons, 'phone')
+        group.survivor_id = survivor
+
+        with self._benchmark('merge_duplicates', 1), self.assertQueryCount(__system__=120):
+            group.action_merge()
+        self.assertFalse(duplicate.exists())
+        self.assertEqual(group.state, 'merged')
+        self.assertEqual(applicant.talent_id, survivor)
+        self.assertEqual(survivor.experience_ids, experiences)
+        # Dezelfde catalogusskills worden niet dubbel bewaard
+        self.assertEqual(len(survivor.skill_ids), skill_count)
+        self.assertEqual(survivor.application_count, 1)
+
+    def _create_cv(self, env, talent, raw):
+        return env['ir.attachment'].create({
+            'name': 'cv.docx', 'raw': raw, 'mimetype': DOCX_MIMETYPE,
+            'res_model': talent._name, 'res_id': talent.id,
+        })
+
+    def test_cv_queue(self):
+        Job = self.env['wiz.recruitment.talentpool.cv.job']
+        talent = self.talents[0]
+        talent.cv_attachment_id = self._create_cv(self.env, talent, b'geen docx')
+        job = talent.cv_job_ids
+        self.assertEqual(job.state, 'pending')
+        # Een onleesbaar bestand wordt later opnieuw geprobeerd, tot CV_MAX_ATTEMPTS keer
+        Job._cron_process_queue()
+        self.assertEqual((job.state, job.attempts), ('pending', 1))
+        self.assertGreater(job.next_attempt, fields.Datetime.now())
+        self.assertNotIn(job, Job._acquire_batch(100))
+        for attempt in range(2, CV_MAX_ATTEMPTS + 1):
+            job.next_attempt = False
+            Job._cron_process_queue()
+            self.assertEqual(job.attempts, attempt)
+        self.assertEqual(job.state, 'failed')
+        # Een nieuw cv zet dezelfde taak terug in de wachtrij
+        talent.cv_attachment_id = self._create_cv(self.env, talent, _docx('Python ontwikkelaar'))
+        self.assertEqual(talent.cv_job_ids, job)
+        self.assertEqual((job.state, job.attempts), ('pending', 0))
+        self.assertEqual(Job._acquire_batch(100) & job, job)
+        Job._cron_process_queue()
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(talent.cv_text, 'Python ontwikkelaar')
+
+    def test_cv_queue_skip_locked(self):
+        # Andere transacties zien enkel gecommitte taken: die apart aanmaken en achteraf opruimen
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            talents = self._generate_talents(env, 2, children=0, prefix='wachtrij')
+            for talent in talents:
+                talent.cv_attachment_id = self._create_cv(env, talent, _docx('Wachtrij'))
+            talent_ids, job_ids = talents.ids, talents.cv_job_ids.ids
+        self.addCleanup(self._unlink_committed_talents, talent_ids)
+
+        with self.registry.cursor() as first, self.registry.cursor() as second:
+            first_jobs = api.Environment(first, SUPERUSER_ID, {})['wiz.recruitment.talentpool.cv.job']._acquire_batch(1)
+            second_jobs = api.Environment(second, SUPERUSER_ID, {})['wiz.recruitment.talentpool.cv.job']._acquire_batch(1000)
+            self.assertTrue(first_jobs)
+            # De tweede worker slaat de vergrendelde taak over en neemt de rest
+            self.assertNotIn(first_jobs.id, second_jobs.ids)
+            self.assertLessEqual(set(job_ids) - set(first_jobs.ids), set(second_jobs.ids))
+            first.rollback()
+            second.rollback()
+
+    def _unlink_committed_talents(self, talent_ids):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            talents = env['wiz.recruitment.talentpool.talent'].browse(talent_ids).exists()
+            talents.unlink()
+            env['ir.attachment'].search([('res_model', '=', talents._name), ('res_id', 'in', talent_ids)]).unlink()
+            env['wiz.recruitment.talentpool.change'].search([('talent_id', 'in', talent_ids)]).unlink()